@@ -0,0 +1,85 @@
+import threading
+import time
+
+
+
+class CircuitBreaker:
+    """
+    Circuit Breaker pro Host, der den Verkehr nach wiederholten Sperren (z. B. Access Denied) pausiert.
+
+    Nach `threshold` aufeinanderfolgenden Fehlschlägen ist der Breaker für `cooldown` Sekunden offen und
+    `allow()` liefert False. Danach wird genau eine Testanfrage durchgelassen (halb offen): Gelingt sie,
+    schließt sich der Breaker, schlägt sie fehl, öffnet er sich erneut mit verdoppelter Pause (bis `max_cooldown`).
+
+    Beispiel:
+        >>> breaker = CircuitBreaker.for_host("www.researchgate.net")
+        >>> if breaker.allow():
+        ...     ok = load_page()
+        ...     breaker.record_success() if ok else breaker.record_failure()
+        >>> breaker.remaining()  # Sekunden bis zur nächsten erlaubten Anfrage
+    """
+
+    _breakers = {}
+    _breakers_lock = threading.Lock()
+
+    def __init__(self, host: str, threshold: int = 3, cooldown: float = 60, max_cooldown: float = 900):
+        self.host = host
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self._probing = False  # True, solange eine Testanfrage im halb offenen Zustand läuft
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_host(cls, host: str, **kwargs) -> "CircuitBreaker":
+        """Gemeinsamer Breaker pro Host und Prozess."""
+        with cls._breakers_lock:
+            if host not in cls._breakers:
+                cls._breakers[host] = cls(host, **kwargs)
+            return cls._breakers[host]
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' oder 'half_open'."""
+        with self._lock:
+            if self.failures < self.threshold:
+                return "closed"
+            return "open" if time.monotonic() < self.open_until else "half_open"
+
+    def remaining(self) -> float:
+        """Sekunden, bis wieder Anfragen erlaubt sind (0, wenn der Breaker geschlossen ist)."""
+        with self._lock:
+            return max(0.0, self.open_until - time.monotonic())
+
+    def allow(self) -> bool:
+        """Prüft, ob eine Anfrage gesendet werden darf."""
+        with self._lock:
+            if self.failures < self.threshold:
+                return True
+            if time.monotonic() < self.open_until:
+                return False
+            # Halb offen: eine Testanfrage, weitere erst nach Ergebnis oder erneutem Ablauf der Pause
+            self._probing = True
+            self.open_until = time.monotonic() + self.cooldown
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self.open_until = 0.0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures < self.threshold:
+                return
+            if self._probing:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._probing = False
+            self.open_until = time.monotonic() + self.cooldown
+            print(f"🚧 Circuit Breaker für {self.host} offen – Pause für {round(self.cooldown)} Sekunden")
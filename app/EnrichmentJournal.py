@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# eigene Module
+from cache_paths import CACHE_DIR
+from PersonKey import PersonKey
+
+
+
+class EnrichmentJournal:
+    """
+    Persistentes Journal für Läufe der Profilgenerierung (SQLite).
+
+    Jede abgeschlossene Suche wird sofort unter (run_id, Personenschlüssel) gespeichert, der Anzeigename
+    steht in einer eigenen Spalte. „Müller, Hans“ und „Hans Mueller“ teilen sich so einen Eintrag.
+    Die run_id wird aus dem Hash der Arbeitsmappe, dem Tabellenblatt und dem Call-Filter gebildet,
+    sodass ein abgebrochener Lauf (Browser-Refresh, Widget-Änderung, Container-Neustart)
+    im Resume-Modus an der gleichen Stelle fortgesetzt werden kann.
+
+    Beispiel:
+        >>> journal = EnrichmentJournal()
+        >>> workbook_hash = EnrichmentJournal.workbook_hash(file_bytes)
+        >>> run_id = EnrichmentJournal.make_run_id(workbook_hash, "Panel Members", "CoG 2023")
+        >>> journal.record(run_id, workbook_hash, "Sara van de Geer", {"profile": "statistics", "affiliation": "ETH Zürich"})
+        >>> journal.completed(run_id)
+        {'sara van de geer': {'profile': 'statistics', 'affiliation': 'ETH Zürich'}}
+    """
+
+    DEFAULT_PATH = os.path.join(CACHE_DIR, "enrichment_journal.db")
+
+    # Ergebnisse mit diesem Status werden beim Fortsetzen immer erneut gesucht (Sperre, Seite nicht geladen)
+    RETRY_STATUSES = {"temporary_failure"}
+
+    def __init__(self, db_path: str = DEFAULT_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(lookups)")]
+            if columns and "person_key" not in columns:
+                conn.execute("ALTER TABLE lookups RENAME TO lookups_by_name")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS lookups (
+                    run_id TEXT NOT NULL,
+                    workbook_hash TEXT NOT NULL,
+                    person_key TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    finished_at REAL NOT NULL,
+                    PRIMARY KEY (run_id, person_key)
+                )
+            """)
+            if columns and "person_key" not in columns:
+                # Journale aus Versionen, die nach dem Anzeigenamen gespeichert haben, übernehmen
+                rows = conn.execute(
+                    "SELECT run_id, workbook_hash, name, result, finished_at FROM lookups_by_name ORDER BY finished_at"
+                ).fetchall()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO lookups (run_id, workbook_hash, person_key, name, result, finished_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(run_id, workbook, PersonKey.of(name), name, result, finished)
+                     for run_id, workbook, name, result, finished in rows],
+                )
+                conn.execute("DROP TABLE lookups_by_name")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Eine Verbindung pro Aufruf, damit das Journal auch aus Hintergrund-Threads nutzbar ist
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def workbook_hash(file_bytes: bytes) -> str:
+        """SHA-256 der hochgeladenen Arbeitsmappe."""
+        return hashlib.sha256(file_bytes).hexdigest()
+
+    @staticmethod
+    def make_run_id(workbook_hash: str, sheet_name: str, call_filter: str | None = None) -> str:
+        """Deterministische run_id aus Arbeitsmappe, Tabellenblatt und Call-Filter."""
+        key = f"{workbook_hash}|{sheet_name}|{call_filter or ''}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+    def record(self, run_id: str, workbook_hash: str, name: str, result: dict) -> None:
+        """Speichert das Ergebnis einer abgeschlossenen Suche unter dem Personenschlüssel (überschreibt vorhandene Einträge)."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO lookups (run_id, workbook_hash, person_key, name, result, finished_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, workbook_hash, PersonKey.of(name), name, json.dumps(result, ensure_ascii=False), time.time()),
+            )
+
+    def completed(self, run_id: str) -> dict[str, dict]:
+        """Gibt alle bereits abgeschlossenen Suchen eines Laufs zurück (Personenschlüssel -> Ergebnis)."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT person_key, result FROM lookups WHERE run_id = ?", (run_id,)).fetchall()
+        return {person_key: json.loads(result) for person_key, result in rows}
+
+    @classmethod
+    def needs_retry(cls, result: dict, force_retry: bool = False) -> bool:
+        """True, wenn ein Journal-Ergebnis nicht übernommen, sondern erneut gesucht werden soll."""
+        status = result.get("status")
+        return status in cls.RETRY_STATUSES or (force_retry and status == "not_found")
+
+    def clear(self, run_id: str) -> int:
+        """Löscht alle Einträge eines Laufs. Gibt die Anzahl gelöschter Einträge zurück."""
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM lookups WHERE run_id = ?", (run_id,))
+        return cursor.rowcount
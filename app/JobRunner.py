@@ -0,0 +1,258 @@
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from random import uniform
+from typing import Callable, Iterable
+
+
+
+class RetryLater(Exception):
+    """
+    Signalisiert dem JobRunner, dass ein Eintrag vorübergehend blockiert ist (z. B. Access Denied).
+
+    Der Eintrag wird nach `delay` Sekunden erneut versucht, während die übrigen Einträge weiterlaufen.
+    Ist die maximale Anzahl an Versuchen erreicht, wird `fallback` als Ergebnis übernommen
+    (oder ein Fehler gespeichert, wenn kein Fallback angegeben ist).
+    """
+
+    def __init__(self, reason: str = "", delay: float = 30, fallback=None):
+        super().__init__(reason)
+        self.delay = delay
+        self.fallback = fallback
+
+
+class Job:
+    """
+    Ein Hintergrund-Job, der eine Funktion auf eine Liste von Einträgen anwendet (nacheinander oder parallel).
+
+    Fortschritt, Teilergebnisse und Status können jederzeit (thread-sicher) abgefragt werden.
+    Status: 'queued', 'running', 'done', 'cancelled' oder 'failed'.
+    """
+
+    def __init__(self, title: str, items: Iterable, initial_results: dict | None = None):
+        self.job_id = uuid.uuid4().hex
+        self.title = title
+        self.items = list(items)
+        self.results = dict(initial_results or {})
+        self.errors = {}
+        self.attempts = {}  # Eintrag -> Anzahl der Versuche
+        self.retry_pending = 0  # Einträge, die gerade in der Retry-Queue warten
+        self._status = "queued"
+        self.current_item = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def processed(self) -> int:
+        """Anzahl der bereits verarbeiteten Einträge aus dieser Job-Liste."""
+        with self._lock:
+            return sum(1 for item in self.items if item in self.results or item in self.errors)
+
+    @property
+    def progress(self) -> float:
+        """Fortschritt zwischen 0.0 und 1.0."""
+        if not self.items:
+            return 1.0
+        return self.processed / len(self.items)
+
+    @property
+    def status(self) -> str:
+        with self._lock:
+            return self._status
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "cancelled", "failed")
+
+    def cancel(self) -> None:
+        """Fordert den Abbruch an. Der aktuell laufende Eintrag wird noch zu Ende verarbeitet."""
+        self._cancel_event.set()
+        with self._lock:
+            if self._status == "queued":
+                self._status = "cancelled"
+                self.finished_at = time.time()
+
+    def _start(self) -> bool:
+        """Wechselt von 'queued' zu 'running'. False, wenn der Job vorher abgebrochen wurde."""
+        with self._lock:
+            if self._status != "queued" or self._cancel_event.is_set():
+                return False
+            self._status = "running"
+            self.started_at = time.time()
+            return True
+
+    def _set_status(self, status: str) -> None:
+        with self._lock:
+            self._status = status
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def snapshot(self) -> dict:
+        """Kopie der bisherigen Ergebnisse (Eintrag -> Ergebnis)."""
+        with self._lock:
+            return dict(self.results)
+
+    def _set_result(self, item, result) -> None:
+        with self._lock:
+            self.results[item] = result
+
+    def _set_error(self, item, error: Exception) -> None:
+        with self._lock:
+            self.errors[item] = str(error)
+
+
+class JobRunner:
+    """
+    Thread-basierter Job-Runner, der lange Läufe (Profilgenerierung, PDF-Extraktion) von Streamlit-Reruns entkoppelt.
+
+    Der Runner wird einmal pro Prozess angelegt (z. B. über `st.cache_resource`) und von allen Sessions geteilt.
+    Jede Session merkt sich nur ihre job_id und fragt Fortschritt und Teilergebnisse über `get()` ab.
+    Mehrere Jobs laufen parallel bis `max_workers`, weitere warten in der Queue.
+
+    Beispiel:
+        >>> runner = JobRunner(max_workers=2)
+        >>> job_id = runner.submit("Profilgenerierung", generate_researcher_profile, ["Sara van de Geer"])
+        >>> job = runner.get(job_id)
+        >>> job.progress, job.status, job.snapshot()
+        >>> runner.cancel(job_id)
+
+        Eine PDF-Extraktion ist ein Job mit einem einzigen Eintrag:
+        >>> runner.submit("PDF-Extraktion", lambda path: PdfMemberExtractor().extract(pdf_path=path), [pdf_path])
+    """
+
+    def __init__(self, max_workers: int = 2, max_finished_jobs: int = 50):
+        self.max_finished_jobs = max_finished_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="erc-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, title: str, func: Callable, items: Iterable,
+               on_result: Callable | None = None,
+               initial_results: dict | None = None,
+               delay: tuple[float, float] | None = None,
+               workers: int = 1,
+               max_attempts: int = 3) -> str:
+        """
+        Legt einen neuen Job an und reiht ihn in die Queue ein.
+
+        Args:
+            title: Anzeigename des Jobs
+            func: Funktion, die pro Eintrag aufgerufen wird und ein Ergebnis zurückgibt
+            items: Einträge (z. B. Namen), die verarbeitet werden sollen
+            on_result: Optionaler Callback (Eintrag, Ergebnis), z. B. zum Schreiben ins Run-Journal
+            initial_results: Bereits vorhandene Ergebnisse (z. B. aus dem Journal beim Fortsetzen)
+            delay: Optionale zufällige Pause (min, max) in Sekunden zwischen zwei Einträgen
+            workers: Anzahl der Einträge, die innerhalb dieses Jobs parallel verarbeitet werden
+            max_attempts: Maximale Versuche pro Eintrag, wenn `func` ein `RetryLater` auslöst
+
+        Returns:
+            job_id als String
+        """
+        job = Job(title, items, initial_results=initial_results)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        self._executor.submit(self._run, job, func, on_result, delay, workers, max_attempts)
+        return job.job_id
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def jobs(self) -> list[Job]:
+        """Alle bekannten Jobs, neueste zuerst."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def _prune(self) -> None:
+        # Nur die neuesten abgeschlossenen Jobs behalten, damit der Speicher nicht wächst
+        finished = sorted((job for job in self._jobs.values() if job.done), key=lambda job: job.created_at)
+        for job in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job.job_id]
+
+    def _run(self, job: Job, func: Callable, on_result: Callable | None,
+             delay: tuple[float, float] | None, workers: int = 1, max_attempts: int = 3) -> None:
+        if not job._start():
+            return
+
+        def process(item):
+            """Verarbeitet einen Eintrag. Gibt die Wartezeit zurück, falls er später erneut versucht werden soll."""
+            if job.cancelled:
+                return None
+            job.current_item = item
+            job.attempts[item] = job.attempts.get(item, 0) + 1
+            try:
+                result = func(item)
+            except RetryLater as e:
+                if job.attempts[item] < max_attempts:
+                    print(f"⏳ '{item}' blockiert ({e}) – neuer Versuch in {round(e.delay, 1)} Sekunden")
+                    return e.delay
+                if e.fallback is None:
+                    job._set_error(item, e)
+                    return None
+                result = e.fallback
+            except Exception as e:
+                print(f"❌ Fehler im Job '{job.title}' für '{item}': {e}")
+                job._set_error(item, e)
+                return None
+            job._set_result(item, result)
+            if on_result is not None:
+                # Ein Fehler im Callback (z. B. gesperrte Journal-Datei) betrifft nur diesen Eintrag, nicht den Job
+                try:
+                    on_result(item, result)
+                except Exception as e:
+                    print(f"⚠️ Callback für '{item}' im Job '{job.title}' fehlgeschlagen: {e}")
+            if delay:
+                time.sleep(uniform(*delay))
+            return None
+
+        try:
+            ready = [item for item in job.items if item not in job.results]
+            ready.reverse()  # pop() liefert die Einträge in der ursprünglichen Reihenfolge
+            retry_queue = []  # Heap aus (Zeitpunkt, Reihenfolge, Eintrag)
+            order = itertools.count()
+            with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=f"erc-job-{job.job_id[:6]}") as pool:
+                running = {}
+                while (ready or retry_queue or running) and not job.cancelled:
+                    # Fällige Retries zurück in die Warteschlange
+                    while retry_queue and retry_queue[0][0] <= time.monotonic():
+                        ready.append(heapq.heappop(retry_queue)[2])
+                    while ready and len(running) < max(1, workers):
+                        item = ready.pop()
+                        running[pool.submit(process, item)] = item
+                    job.retry_pending = len(retry_queue)
+
+                    if running:
+                        timeout = max(0.0, retry_queue[0][0] - time.monotonic()) if retry_queue else None
+                        finished, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            item = running.pop(future)
+                            retry_delay = future.result()
+                            if retry_delay is not None:
+                                heapq.heappush(retry_queue, (time.monotonic() + retry_delay, next(order), item))
+                    elif retry_queue:
+                        # Nur noch blockierte Einträge: in kurzen Schritten warten, damit ein Abbruch greift
+                        time.sleep(min(1.0, max(0.0, retry_queue[0][0] - time.monotonic())))
+            job.retry_pending = 0
+            job._set_status("cancelled" if job.cancelled else "done")
+        except Exception as e:
+            print(f"❌ Job '{job.title}' abgebrochen: {e}")
+            job._set_status("failed")
+        finally:
+            job.current_item = None
+            job.finished_at = time.time()
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import time
+
+# eigene Module
+from cache_paths import CACHE_DIR
+from PersonKey import PersonKey
+
+
+
+class NegativeCache:
+    """
+    Cache für Fehlschläge (Misses) pro Provider, z. B. "Keine ORCID gefunden" oder fehlende ResearchGate-Skills.
+
+    Jeder Provider hat eine eigene, kürzere TTL als ein normaler Cache. Solange ein Miss gültig ist,
+    wird der Name für diesen Provider nicht erneut angefragt (keine API-Calls, kein Browser-Start).
+    Mit `force_retry=True` in den Hilfsfunktionen oder `clear()` kann eine erneute Suche erzwungen werden.
+
+    Beispiel:
+        >>> cache = NegativeCache()
+        >>> cache.record_miss("orcid", "Max Mustermann", "no_orcid")  # "openalex": kein Treffer, "orcid": keine ORCID
+        >>> cache.is_miss("orcid", "Max Mustermann")
+        True
+    """
+
+    DEFAULT_PATH = os.path.join(CACHE_DIR, "negative_cache.db")
+
+    # TTL in Sekunden pro Provider
+    DEFAULT_TTLS = {
+        "openalex": 7 * 24 * 3600,
+        "orcid": 7 * 24 * 3600,
+        "researchgate": 3 * 24 * 3600,
+    }
+
+    def __init__(self, db_path: str = DEFAULT_PATH, ttls: dict | None = None):
+        self.db_path = db_path
+        self.ttls = {**NegativeCache.DEFAULT_TTLS, **(ttls or {})}
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS misses (
+                    provider TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    reason TEXT,
+                    cached_at REAL NOT NULL,
+                    PRIMARY KEY (provider, key)
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return PersonKey.of(name)
+
+    def is_miss(self, provider: str, name: str) -> bool:
+        """True, wenn für diesen Provider ein noch gültiger Miss gespeichert ist."""
+        ttl = self.ttls.get(provider, 24 * 3600)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT cached_at FROM misses WHERE provider = ? AND key = ?",
+                (provider, self._key(name)),
+            ).fetchone()
+        return row is not None and time.time() - row[0] < ttl
+
+    def record_miss(self, provider: str, name: str, reason: str | None = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO misses (provider, key, reason, cached_at) VALUES (?, ?, ?, ?)",
+                (provider, self._key(name), reason, time.time()),
+            )
+
+    def forget(self, provider: str, name: str) -> None:
+        """Entfernt einen Miss, z. B. nachdem eine erzwungene Suche erfolgreich war."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM misses WHERE provider = ? AND key = ?", (provider, self._key(name)))
+
+    def clear(self, provider: str | None = None) -> int:
+        """Löscht alle Misses (optional nur eines Providers). Gibt die Anzahl gelöschter Einträge zurück."""
+        with self._connect() as conn:
+            if provider:
+                cursor = conn.execute("DELETE FROM misses WHERE provider = ?", (provider,))
+            else:
+                cursor = conn.execute("DELETE FROM misses")
+        return cursor.rowcount
+
+    def count(self, provider: str | None = None) -> int:
+        with self._connect() as conn:
+            if provider:
+                return conn.execute("SELECT COUNT(*) FROM misses WHERE provider = ?", (provider,)).fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM misses").fetchone()[0]
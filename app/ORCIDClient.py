@@ -1,5 +1,7 @@
 import requests
 
+# eigene Module
+from PageArchive import PageArchive
 
 
 
@@ -17,6 +19,7 @@ class ORCIDClient:
         
         try:
             response = requests.get(url, headers=headers, timeout=10)
+            PageArchive.capture("orcid", url, response.text, status=response.status_code)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -24,14 +27,18 @@ class ORCIDClient:
             return None
     
     @staticmethod
-    def get_current_affiliation(orcid_id: str) -> str | None:
+    def get_current_affiliation(orcid_id: str, profile: dict | None = None) -> str | None:
         """
         Holt die aktuelle Affiliation (neueste Employment oder Education).
+
+        Args:
+            orcid_id: ORCID-ID
+            profile: Bereits geladenes Profil (z. B. aus dem Seitenarchiv), sonst wird es abgerufen
         
         Returns:
             Name der Institution oder None
         """
-        profile = ORCIDClient.get_profile(orcid_id)
+        profile = profile or ORCIDClient.get_profile(orcid_id)
         
         if not profile:
             return None
@@ -114,6 +121,7 @@ class ORCIDClient:
         
         try:
             response = requests.get(url, headers=headers, timeout=10)
+            PageArchive.capture("orcid", url, response.text, status=response.status_code)
             response.raise_for_status()
             data = response.json()
             
@@ -153,8 +161,14 @@ class ORCIDClient:
         Returns:
             Dictionary mit affiliation, biography, keywords, works_count
         """
-        profile = ORCIDClient.get_profile(orcid_id)
-        
+        return ORCIDClient.research_info_from_profile(ORCIDClient.get_profile(orcid_id), orcid_id)
+
+    @staticmethod
+    def research_info_from_profile(profile: dict | None, orcid_id: str | None = None) -> dict:
+        """Liest die Forschungsinformationen aus einem geladenen Profil (ohne weiteren API-Aufruf)."""
+        if orcid_id is None and profile:
+            orcid_id = (profile.get('orcid-identifier') or {}).get('path')
+
         if not profile:
             return {
                 'affiliation': None,
@@ -165,7 +179,7 @@ class ORCIDClient:
             }
         
         # Aktuelle Affiliation
-        affiliation = ORCIDClient.get_current_affiliation(orcid_id)
+        affiliation = ORCIDClient.get_current_affiliation(orcid_id, profile=profile)
         
         # Biografie
         biography = None
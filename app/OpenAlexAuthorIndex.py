@@ -0,0 +1,211 @@
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+# eigene Module
+from cache_paths import CACHE_DIR
+from PersonKey import PersonKey
+
+
+
+class OpenAlexAuthorIndex:
+    """
+    Lokaler Index über einen OpenAlex-Autoren-Snapshot (SQLite FTS5).
+
+    Ein Snapshot (JSONL bzw. .gz-Dateien aus `openalex-snapshot/data/authors/`) wird einmalig eingelesen,
+    optional gefiltert nach Institution oder Land. Jeder Autor wird unter seinem normalisierten
+    display_name und allen display_name_alternatives abgelegt. Die Suche liefert Kandidaten im gleichen
+    Format wie die OpenAlex-API, sodass `score_openalex_candidate` unverändert genutzt werden kann.
+
+    Beispiel (Kommandozeile):
+        python app/OpenAlexAuthorIndex.py ingest openalex-snapshot/data/authors --country DE --country NO
+        python app/OpenAlexAuthorIndex.py search "Sara van de Geer"
+
+    Beispiel (Python):
+        >>> index = OpenAlexAuthorIndex()
+        >>> index.search("Sara van de Geer", limit=5)
+    """
+
+    DEFAULT_PATH = os.path.join(CACHE_DIR, "openalex_authors.db")
+
+    # Nur diese Felder werden aus dem Snapshot übernommen
+    KEEP_FIELDS = ["id", "orcid", "display_name", "works_count", "last_known_institutions", "affiliations", "topics"]
+
+    def __init__(self, db_path: str = DEFAULT_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS authors (
+                    id TEXT PRIMARY KEY,
+                    orcid TEXT,
+                    works_count INTEGER,
+                    record TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS author_names (
+                    name_key TEXT NOT NULL,
+                    author_id TEXT NOT NULL,
+                    PRIMARY KEY (name_key, author_id)
+                )
+            """)
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS author_names_fts
+                USING fts5(name_key, author_id UNINDEXED, tokenize='unicode61')
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Kanonischer Personenschlüssel (siehe `PersonKey`)."""
+        return PersonKey.of(name)
+
+    def is_empty(self) -> bool:
+        if not os.path.exists(self.db_path):
+            return True
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM authors LIMIT 1").fetchone() is None
+
+    @staticmethod
+    def _iter_snapshot_files(path: str):
+        path = Path(path)
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob("*") if p.suffix in (".gz", ".jsonl", ".json"))
+        else:
+            yield path
+
+    @staticmethod
+    def _institutions(author: dict) -> list[dict]:
+        institutions = list(author.get("last_known_institutions") or [])
+        if author.get("last_known_institution"):  # ältere Snapshots
+            institutions.append(author["last_known_institution"])
+        institutions += [a.get("institution") or {} for a in author.get("affiliations") or []]
+        return institutions
+
+    def _matches_filter(self, author: dict, institutions: list[str] | None, countries: list[str] | None) -> bool:
+        if not institutions and not countries:
+            return True
+        author_institutions = self._institutions(author)
+        if countries and any(inst.get("country_code") in countries for inst in author_institutions):
+            return True
+        if institutions:
+            names = " | ".join(f"{inst.get('display_name', '')} {inst.get('ror', '')} {inst.get('id', '')}".casefold()
+                               for inst in author_institutions)
+            return any(term.casefold() in names for term in institutions)
+        return False
+
+    def ingest(self, snapshot_path: str, institutions: list[str] | None = None,
+               countries: list[str] | None = None, batch_size: int = 10_000) -> int:
+        """
+        Liest einen OpenAlex-Autoren-Snapshot ein.
+
+        Args:
+            snapshot_path: JSONL-/GZ-Datei oder Ordner mit Snapshot-Dateien
+            institutions: Optional, nur Autoren mit einer dieser Institutionen (Name, ROR oder OpenAlex-ID, Teilstring)
+            countries: Optional, nur Autoren mit Institution in diesen Ländern (ISO-Alpha-2)
+            batch_size: Anzahl Autoren pro Schreibvorgang
+
+        Returns:
+            Anzahl der eingelesenen Autoren
+        """
+        countries = [c.upper() for c in countries] if countries else None
+        total = 0
+        authors_batch, names_batch = [], []
+
+        def flush(conn):
+            last_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM author_names").fetchone()[0]
+            conn.executemany("INSERT OR REPLACE INTO authors (id, orcid, works_count, record) VALUES (?, ?, ?, ?)", authors_batch)
+            conn.executemany("INSERT OR IGNORE INTO author_names (name_key, author_id) VALUES (?, ?)", names_batch)
+            # Nur neue Namen in den Volltextindex übernehmen (gleiche rowid wie in author_names)
+            conn.execute("""
+                INSERT INTO author_names_fts (rowid, name_key, author_id)
+                SELECT rowid, name_key, author_id FROM author_names WHERE rowid > ?
+            """, (last_rowid,))
+            authors_batch.clear()
+            names_batch.clear()
+
+        with self._connect() as conn:
+            for file in self._iter_snapshot_files(snapshot_path):
+                opener = gzip.open if file.suffix == ".gz" else open
+                print(f"📥 Lese {file} ...")
+                with opener(file, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        author = json.loads(line)
+                        if not self._matches_filter(author, institutions, countries):
+                            continue
+                        record = {field: author.get(field) for field in self.KEEP_FIELDS}
+                        if not record["last_known_institutions"] and author.get("last_known_institution"):
+                            record["last_known_institutions"] = [author["last_known_institution"]]
+                        record["topics"] = (record["topics"] or [])[:10]
+                        authors_batch.append((record["id"], record["orcid"], record["works_count"] or 0,
+                                              json.dumps(record, ensure_ascii=False)))
+                        name_keys = {self.normalize(n) for n in [author.get("display_name")] + (author.get("display_name_alternatives") or [])}
+                        names_batch.extend((key, record["id"]) for key in name_keys if key)
+                        total += 1
+                        if len(authors_batch) >= batch_size:
+                            flush(conn)
+            flush(conn)
+        print(f"✅ {total} Autoren in {self.db_path} eingelesen")
+        return total
+
+    def search(self, name: str, limit: int = 10) -> list[dict]:
+        """
+        Sucht Kandidaten für einen Namen. Exakte Treffer auf den normalisierten Namen kommen zuerst,
+        danach Volltexttreffer (alle Namensbestandteile müssen vorkommen), jeweils nach works_count sortiert.
+
+        Returns:
+            Liste von Autoren im Format der OpenAlex-API (id, orcid, display_name, affiliations, topics, ...)
+        """
+        key = self.normalize(name)
+        if not key:
+            return []
+        fts_query = " ".join(f'"{token}"' for token in key.split())
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT a.record FROM author_names n JOIN authors a ON a.id = n.author_id
+                WHERE n.name_key = ? ORDER BY a.works_count DESC LIMIT ?
+            """, (key, limit)).fetchall()
+            if len(rows) < limit:
+                rows += conn.execute("""
+                    SELECT a.record FROM author_names_fts f JOIN authors a ON a.id = f.author_id
+                    WHERE author_names_fts MATCH ? AND f.name_key != ?
+                    GROUP BY a.id ORDER BY a.works_count DESC LIMIT ?
+                """, (fts_query, key, limit - len(rows))).fetchall()
+        seen, results = set(), []
+        for (record,) in rows:
+            author = json.loads(record)
+            if author["id"] not in seen:
+                seen.add(author["id"])
+                results.append(author)
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokaler OpenAlex-Autorenindex")
+    parser.add_argument("--db", default=OpenAlexAuthorIndex.DEFAULT_PATH, help="Pfad zur Index-Datenbank")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Snapshot einlesen")
+    ingest_parser.add_argument("snapshot_path", help="JSONL-/GZ-Datei oder Ordner des OpenAlex-Autoren-Snapshots")
+    ingest_parser.add_argument("--institution", action="append", help="Nur Autoren dieser Institution (mehrfach möglich)")
+    ingest_parser.add_argument("--country", action="append", help="Nur Autoren aus diesem Land, ISO-Alpha-2 (mehrfach möglich)")
+
+    search_parser = subparsers.add_parser("search", help="Namen im Index suchen")
+    search_parser.add_argument("name")
+    search_parser.add_argument("--limit", type=int, default=10)
+
+    args = parser.parse_args()
+    index = OpenAlexAuthorIndex(db_path=args.db)
+    if args.command == "ingest":
+        index.ingest(args.snapshot_path, institutions=args.institution, countries=args.country)
+    else:
+        for author in index.search(args.name, limit=args.limit):
+            print(f"{author['display_name']:<40} {author.get('orcid') or '-':<40} works: {author.get('works_count')}")
@@ -0,0 +1,202 @@
+import argparse
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# eigene Module
+from cache_paths import CACHE_DIR
+
+
+
+class PageArchive:
+    """
+    Komprimiertes, inhaltsadressiertes Archiv aller abgerufenen Rohseiten (ResearchGate, OpenAlex, ORCID).
+
+    Jeder Antwort-Body wird einmal als gzip-Datei unter seinem SHA-256-Hash abgelegt (gleiche Inhalte
+    teilen sich eine Datei). Ein SQLite-Index verknüpft Provider, URL und Abrufzeit mit dem Hash.
+    Mit `replay()` lassen sich Parser ohne Netzwerk und ohne Browser über alle archivierten Seiten laufen lassen,
+    z. B. um geänderte Skills-Selektoren an tausenden gespeicherten Profilen zu prüfen.
+
+    Ablage: <ERC_CACHE_DIR>/page_archive/ (abschaltbar mit ERC_PAGE_ARCHIVE=0)
+
+    Beispiel:
+        >>> archive = PageArchive.shared()
+        >>> archive.store("researchgate", url, html, status=200)
+        >>> results = archive.replay("researchgate", ResearchGateSelenium.parse_skills_html)
+
+    Kommandozeile:
+        python PageArchive.py stats
+        python PageArchive.py replay researchgate
+    """
+
+    DEFAULT_DIR = os.path.join(CACHE_DIR, "page_archive")
+    ENABLED = os.getenv("ERC_PAGE_ARCHIVE", "1") != "0"
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, base_dir: str = DEFAULT_DIR):
+        self.base_dir = base_dir
+        self.objects_dir = os.path.join(base_dir, "objects")
+        self.db_path = os.path.join(base_dir, "index.db")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    provider TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    status INTEGER,
+                    content_hash TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_provider_url ON pages (provider, url, fetched_at)")
+
+    @classmethod
+    def shared(cls) -> "PageArchive":
+        """Gemeinsames Archiv pro Prozess."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @classmethod
+    def capture(cls, provider: str, url: str, body: str | bytes, status: int | None = 200) -> None:
+        """Archiviert eine Antwort im gemeinsamen Archiv. Fehler beim Archivieren brechen den Abruf nie ab."""
+        if not cls.ENABLED or body is None:
+            return
+        try:
+            cls.shared().store(provider, url, body, status=status)
+        except Exception as e:
+            print(f"⚠️ Seite konnte nicht archiviert werden: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _object_path(self, content_hash: str) -> str:
+        return os.path.join(self.objects_dir, content_hash[:2], f"{content_hash[2:]}.gz")
+
+    def store(self, provider: str, url: str, body: str | bytes, status: int | None = 200,
+              fetched_at: float | None = None) -> str:
+        """
+        Legt einen Antwort-Body ab und trägt den Abruf in den Index ein.
+
+        Returns:
+            SHA-256-Hash des Inhalts
+        """
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._object_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO pages (provider, url, fetched_at, status, content_hash) VALUES (?, ?, ?, ?, ?)",
+                (provider, url, fetched_at or time.time(), status, content_hash),
+            )
+        return content_hash
+
+    def load(self, content_hash: str) -> str:
+        with gzip.open(self._object_path(content_hash), "rb") as f:
+            return f.read().decode("utf-8", errors="replace")
+
+    def pages(self, provider: str | None = None, latest_only: bool = True) -> list[tuple]:
+        """
+        Archivierte Abrufe als Liste von (provider, url, fetched_at, status, content_hash).
+
+        Mit `latest_only` nur der jüngste Abruf pro URL.
+        """
+        query = "SELECT provider, url, MAX(fetched_at), status, content_hash FROM pages" if latest_only \
+            else "SELECT provider, url, fetched_at, status, content_hash FROM pages"
+        params = ()
+        if provider:
+            query += " WHERE provider = ?"
+            params = (provider,)
+        if latest_only:
+            query += " GROUP BY provider, url"
+        with self._connect() as conn:
+            return conn.execute(query + " ORDER BY provider, url", params).fetchall()
+
+    def replay(self, provider: str, parser, latest_only: bool = True) -> dict:
+        """
+        Lässt einen Parser über alle archivierten Seiten eines Providers laufen (ohne Netzwerk).
+
+        Args:
+            provider: 'researchgate', 'researchgate_search', 'openalex' oder 'orcid'
+            parser: Funktion, die den Body (str) erhält, z. B. `ResearchGateSelenium.parse_skills_html`
+            latest_only: Nur den jüngsten Abruf pro URL verwenden
+
+        Returns:
+            Dictionary URL -> Parser-Ergebnis (bei Exceptions die Fehlermeldung)
+        """
+        results = {}
+        for _, url, _, _, content_hash in self.pages(provider, latest_only=latest_only):
+            try:
+                results[url] = parser(self.load(content_hash))
+            except Exception as e:
+                results[url] = f"Fehler: {e}"
+        return results
+
+    def stats(self) -> dict:
+        """Anzahl der Abrufe und eindeutigen Inhalte pro Provider."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT provider, COUNT(*), COUNT(DISTINCT url), COUNT(DISTINCT content_hash) FROM pages GROUP BY provider"
+            ).fetchall()
+        return {provider: {"fetches": n, "urls": urls, "contents": contents} for provider, n, urls, contents in rows}
+
+
+def default_parsers() -> dict:
+    """Parser pro Provider, wie sie beim Abruf verwendet werden."""
+    import json
+    from ORCIDClient import ORCIDClient
+    from ResearchGateHttp import ResearchGateHttp
+    from ResearchGateSelenium import ResearchGateSelenium
+
+    def parse_openalex(body):
+        return [(r.get("display_name"), r.get("orcid")) for r in json.loads(body).get("results", [])]
+
+    def parse_orcid(body):
+        return ORCIDClient.research_info_from_profile(json.loads(body))
+
+    # Profilseiten mit denselben Selektoren wie der Browser-Abruf prüfen, Suchseiten getrennt
+    return {
+        "researchgate": ResearchGateSelenium.parse_skills_html,
+        "researchgate_search": ResearchGateHttp.parse_search_results,
+        "openalex": parse_openalex,
+        "orcid": parse_orcid,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archiv der abgerufenen Rohseiten")
+    parser.add_argument("--dir", default=PageArchive.DEFAULT_DIR, help="Archiv-Verzeichnis")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Anzahl archivierter Seiten pro Provider")
+    replay_parser = subparsers.add_parser("replay", help="Parser ohne Netzwerk über das Archiv laufen lassen")
+    replay_parser.add_argument("provider", choices=["researchgate", "researchgate_search", "openalex", "orcid"])
+    replay_parser.add_argument("--all", action="store_true", help="Alle Abrufe statt nur des jüngsten pro URL")
+    replay_parser.add_argument("--show", type=int, default=0, help="Anzahl der Ergebnisse, die ausgegeben werden")
+    args = parser.parse_args()
+
+    archive = PageArchive(args.dir)
+    if args.command == "stats":
+        for provider, counts in archive.stats().items():
+            print(f"📦 {provider}: {counts['fetches']} Abrufe, {counts['urls']} URLs, {counts['contents']} Inhalte")
+    else:
+        start = time.perf_counter()
+        results = archive.replay(args.provider, default_parsers()[args.provider], latest_only=not args.all)
+        duration = time.perf_counter() - start
+        parsed = sum(1 for value in results.values() if value and not (isinstance(value, str) and value.startswith("Fehler")))
+        print(f"🔁 {len(results)} Seiten in {duration:.2f} s verarbeitet, {parsed} mit Ergebnis, {len(results) - parsed} ohne")
+        for url, value in list(results.items())[:args.show]:
+            print(f"   {url}: {value}")
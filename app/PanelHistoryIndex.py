@@ -0,0 +1,355 @@
+import argparse
+import datetime
+import os
+import re
+import sqlite3
+
+import pandas as pd
+
+# eigene Module
+from cache_paths import CACHE_DIR
+from PersonKey import PersonKey
+
+
+
+class PanelHistoryIndex:
+    """
+    Programmübergreifende Historie der Panel-Teilnahmen (StG, CoG, AdG, SyG, ...).
+
+    Die Daten liegen verteilt in den CoG-, StG- und AdG-Arbeitsmappen, in panel-members-excel.xls und in
+    den PDF-Extraktionen. Der Index fasst sie einmal zusammen: Pro Person (normalisierter Name) werden
+    alle Einträge (programme, year, panel, role, source) und eine kompakte Jahres-Bitmaske gespeichert.
+    Abfragen pro Person sind Dictionary-Zugriffe (O(1)); die Daten werden beim ersten Zugriff einmal
+    aus SQLite geladen.
+
+    Beispiel:
+        >>> index = PanelHistoryIndex()
+        >>> index.ingest_workbook("data/4_GEOMAR-relevant_COG_grantees_and_panel_members_2013-2024.xlsx")
+        >>> index.ingest_panel_members_excel("data/panel-members-excel.xls")
+        >>> index.years("Jon Agren")
+        [2014, 2016]
+        >>> index.streaks("Jon Agren"), index.gaps("Jon Agren"), index.programme_overlap("Jon Agren")
+        >>> index.streak_length("Jon Agren", 2016, programme="CoG", grantees=False)
+        1
+
+    Kommandozeile:
+        python PanelHistoryIndex.py ingest ../data/*.xlsx ../data/panel-members-excel.xls
+        python PanelHistoryIndex.py show "Jon Agren"
+    """
+
+    DEFAULT_PATH = os.path.join(CACHE_DIR, "panel_history.db")
+
+    # Bit 0 der Jahres-Bitmaske entspricht diesem Jahr (erste ERC-Calls 2007)
+    BASE_YEAR = 2000
+    # Plausible Call-Jahre: ab dem ersten ERC-Call bis zum Folgejahr (Panels werden vorab veröffentlicht)
+    FIRST_YEAR = 2007
+
+    PROGRAMMES = {"stg": "StG", "cog": "CoG", "adg": "AdG", "syg": "SyG", "poc": "PoC"}
+
+    def __init__(self, db_path: str = DEFAULT_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    person_key TEXT NOT NULL,
+                    name TEXT,
+                    programme TEXT,
+                    year INTEGER NOT NULL,
+                    panel TEXT,
+                    role TEXT,
+                    source TEXT NOT NULL,
+                    UNIQUE (person_key, programme, year, panel, role, source)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_records_source ON records (source)")
+        self._records = None  # person_key -> Liste von (programme, year, panel, role, source)
+        self._masks = None  # person_key -> Jahres-Bitmaske
+        self._names = None  # person_key -> Anzeigename
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def person_key(name) -> str:
+        """Kanonischer Personenschlüssel (siehe `PersonKey`)."""
+        return PersonKey.of(name)
+
+    @classmethod
+    def last_year(cls) -> int:
+        return datetime.date.today().year + 1
+
+    @classmethod
+    def valid_year(cls, year) -> bool:
+        """True für plausible ERC-Jahre (FIRST_YEAR bis `last_year()`)."""
+        return year is not None and not pd.isna(year) and cls.FIRST_YEAR <= year <= cls.last_year()
+
+    @classmethod
+    def parse_call(cls, call) -> tuple[str | None, int | None]:
+        """'CoG 2014' oder 'ERC-2021-COG' -> ('CoG', 2014). Andere vierstellige Zahlen gelten nicht als Jahr."""
+        text = str(call or "")
+        year = next((int(y) for y in re.findall(r"(?<!\d)(\d{4})(?!\d)", text) if cls.valid_year(int(y))), None)
+        programme = re.search(r"(?i)\b(stg|cog|adg|syg|poc)\b", text.replace("-", " "))
+        return (
+            cls.PROGRAMMES[programme.group(1).casefold()] if programme else None,
+            year,
+        )
+
+    # -----------------------------
+    # Befüllen
+    # -----------------------------
+    def add_frame(self, df: pd.DataFrame, source: str, default_role: str | None = None,
+                  programme: str | None = None) -> int:
+        """
+        Übernimmt Einträge aus einem DataFrame. Bisherige Einträge derselben Quelle werden ersetzt.
+
+        Spalten werden über ihren Namen erkannt: 'Name' oder 'First name' + 'Last name', 'Call' oder
+        'year' (+ 'funding_scheme'), 'Panel'/'review_panel'/'panel', 'Function'/'function'.
+
+        Args:
+            df: Tabelle mit Personen und Teilnahmen
+            source: Name der Quelle (z. B. Dateiname + Tabellenblatt)
+            default_role: Rolle, falls keine Function-Spalte vorhanden ist (z. B. 'Grantee')
+            programme: Programm, falls es nicht aus der Call-Spalte hervorgeht
+
+        Returns:
+            Anzahl übernommener Einträge
+        """
+        columns = {" ".join(str(c).split()).casefold(): c for c in df.columns}
+        if "name" in columns:
+            names = df[columns["name"]].fillna("").astype(str)
+        elif "first name" in columns and "last name" in columns:
+            names = PersonKey.full_name(df[columns["first name"]], df[columns["last name"]])
+        else:
+            raise ValueError(f"Keine Namensspalte in '{source}' gefunden")
+
+        if "call" in columns:
+            parsed = df[columns["call"]].map(self.parse_call)
+            programmes = parsed.str[0]
+            years = parsed.str[1]
+        elif "year" in columns:
+            years = pd.to_numeric(df[columns["year"]], errors="coerce")
+            programmes = (df[columns["funding_scheme"]].map(lambda p: self.PROGRAMMES.get(str(p).casefold(), p))
+                          if "funding_scheme" in columns else pd.Series(None, index=df.index, dtype=object))
+        else:
+            raise ValueError(f"Keine Call- oder Jahresspalte in '{source}' gefunden")
+        if programme:
+            programmes = programmes.fillna(programme)
+
+        panel_col = next((columns[c] for c in ("panel", "review_panel") if c in columns), None)
+        role_col = next((columns[c] for c in ("function", "role") if c in columns), None)
+
+        def text(column):
+            # Leere Zellen bleiben leer (NULL) statt als "nan" gespeichert zu werden
+            values = df[column].fillna("").astype(str).str.strip()
+            return values.mask(values.eq(""))
+
+        frame = pd.DataFrame({
+            "name": names.str.strip(),
+            "programme": programmes,
+            "year": years,
+            "panel": text(panel_col) if panel_col else None,
+            "role": text(role_col).str.capitalize() if role_col else default_role,
+        })
+        # Unplausible Jahre (Tippfehler, andere Zahlen) nicht übernehmen: sie würden die Jahres-Bitmaske sprengen
+        invalid = frame["year"].notna() & ~frame["year"].between(self.FIRST_YEAR, self.last_year())
+        if invalid.any():
+            print(f"⚠️ {int(invalid.sum())} Einträge mit unplausiblem Jahr in '{source}' übersprungen")
+        frame = frame[~invalid].dropna(subset=["year"])
+        frame["person_key"] = PersonKey.column(frame["name"]).astype(str)
+        # Namen ohne verwertbare Zeichen (z. B. "* *") ergeben keinen Schlüssel
+        frame = frame[frame["person_key"].ne("")]
+        frame["year"] = frame["year"].astype(int)
+        frame["source"] = source
+
+        rows = frame[["person_key", "name", "programme", "year", "panel", "role", "source"]]
+        rows = rows.astype(object).where(rows.notna(), None)
+        with self._connect() as conn:
+            conn.execute("DELETE FROM records WHERE source = ?", (source,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO records (person_key, name, programme, year, panel, role, source) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows.itertuples(index=False, name=None),
+            )
+        self._records = None  # beim nächsten Zugriff neu laden
+        return len(rows)
+
+    def ingest_workbook(self, path, name: str | None = None) -> int:
+        """Liest die Tabellenblätter 'Panel members' und '... Grantees' einer ERC-Arbeitsmappe ein."""
+        excel = pd.ExcelFile(path)
+        name = name or os.path.basename(str(path))
+        count = 0
+        for sheet in excel.sheet_names:
+            sheet_key = sheet.casefold()
+            try:
+                if "panel member" in sheet_key:
+                    count += self.add_frame(excel.parse(sheet), source=f"{name}:{sheet}")
+                elif "grantee" in sheet_key:
+                    count += self.add_frame(excel.parse(sheet), source=f"{name}:{sheet}", default_role="Grantee")
+            except ValueError as e:
+                # Ein unvollständiges Tabellenblatt soll die übrigen nicht verhindern
+                print(f"⚠️ Tabellenblatt übersprungen: {e}")
+        return count
+
+    def ingest_panel_members_excel(self, path) -> int:
+        """Liest panel-members-excel.xls ein (eine Zeile pro Person und Programm, Jahre kommagetrennt)."""
+        df = pd.read_excel(path, engine="openpyxl")
+        df = df.assign(year=df["year"].astype(str).str.split(",")).explode("year")
+        df["year"] = pd.to_numeric(df["year"].str.strip(), errors="coerce")
+        return self.add_frame(df, source=os.path.basename(str(path)))  # Rolle (Chair/Member) ist dort nicht angegeben
+
+    # -----------------------------
+    # Abfragen
+    # -----------------------------
+    def _load(self) -> None:
+        if self._records is not None:
+            return
+        records, masks, names = {}, {}, {}
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT person_key, name, programme, year, panel, role, source FROM records ORDER BY person_key, year"
+            ).fetchall()
+        for key, name, programme, year, panel, role, source in rows:
+            if not self.valid_year(year):
+                continue  # Altbestand aus Versionen ohne Jahresprüfung
+            records.setdefault(key, []).append((programme, year, panel, role, source))
+            masks[key] = masks.get(key, 0) | (1 << (year - self.BASE_YEAR))
+            names.setdefault(key, name)
+        self._records, self._masks, self._names = records, masks, names
+
+    def is_empty(self) -> bool:
+        self._load()
+        return not self._records
+
+    def history(self, name: str) -> list[tuple]:
+        """Alle Einträge (programme, year, panel, role, source) einer Person, nach Jahr sortiert."""
+        self._load()
+        return self._records.get(self.person_key(name), [])
+
+    def year_mask(self, name: str) -> int:
+        """Bitmaske der Teilnahmejahre (Bit i = Jahr BASE_YEAR + i)."""
+        self._load()
+        return self._masks.get(self.person_key(name), 0)
+
+    def years(self, name: str, programme: str | None = None, grantees: bool | None = None) -> list[int]:
+        """
+        Teilnahmejahre einer Person.
+
+        Args:
+            programme: Nur Einträge dieses Programms (z. B. 'CoG')
+            grantees: True nur Grantee-Einträge, False nur Panel-Einträge (Member, Chair), None alle
+        """
+        if programme is None and grantees is None:
+            mask = self.year_mask(name)
+            return [self.BASE_YEAR + i for i in range(mask.bit_length()) if mask >> i & 1]
+        return sorted({
+            year for record_programme, year, _, role, _ in self.history(name)
+            if (programme is None or record_programme == programme)
+            and (grantees is None or (role == "Grantee") == grantees)
+        })
+
+    def served_in(self, name: str, year: int) -> bool:
+        if year < self.BASE_YEAR:
+            return False
+        return bool(self.year_mask(name) >> (year - self.BASE_YEAR) & 1)
+
+    def has_served_before(self, name: str, year: int) -> bool:
+        """True, wenn die Person vor `year` bereits Einträge hat."""
+        if year <= self.BASE_YEAR:
+            return False
+        return bool(self.year_mask(name) & ((1 << (year - self.BASE_YEAR)) - 1))
+
+    def streaks(self, name: str, min_length: int = 1) -> list[tuple[int, int, int]]:
+        """Aufeinanderfolgende Jahre als Liste von (start, ende, länge)."""
+        result = []
+        start = previous = None
+        for year in self.years(name):
+            if previous is None or year != previous + 1:
+                if start is not None:
+                    result.append((start, previous, previous - start + 1))
+                start = year
+            previous = year
+        if start is not None:
+            result.append((start, previous, previous - start + 1))
+        return [streak for streak in result if streak[2] >= min_length]
+
+    def streak_length(self, name: str, year: int, programme: str | None = None, grantees: bool | None = None) -> int:
+        """Länge der Serie aufeinanderfolgender Jahre, die in `year` endet (0, wenn kein Eintrag in `year`)."""
+        years = set(self.years(name, programme=programme, grantees=grantees))
+        length = 0
+        while year - length in years:
+            length += 1
+        return length
+
+    def longest_streak(self, name: str) -> int:
+        return max((length for _, _, length in self.streaks(name)), default=0)
+
+    def gaps(self, name: str) -> list[tuple[int, int]]:
+        """Lücken zwischen Teilnahmen als Liste von (letztes Jahr davor, nächstes Jahr danach)."""
+        years = self.years(name)
+        return [(a, b) for a, b in zip(years, years[1:]) if b > a + 1]
+
+    def role_changes(self, name: str) -> list[tuple[int, str, str]]:
+        """Wechsel der Rolle (z. B. Member -> Chair, Grantee -> Member) als (jahr, alte rolle, neue rolle)."""
+        changes = []
+        previous = None
+        for _, year, _, role, _ in self.history(name):
+            if role and previous and role != previous:
+                changes.append((year, previous, role))
+            previous = role or previous
+        return changes
+
+    def programme_overlap(self, name: str) -> dict[str, list[int]]:
+        """Jahre pro Programm, z. B. {'CoG': [2014, 2016], 'AdG': [2021]}."""
+        overlap = {}
+        for programme, year, _, _, _ in self.history(name):
+            years = overlap.setdefault(programme or "?", [])
+            if year not in years:
+                years.append(year)
+        return overlap
+
+    def summary(self, names) -> pd.DataFrame:
+        """Kompakte Übersicht für mehrere Personen (eine Zeile pro Name), z. B. für die Streamlit-Tabs."""
+        rows = []
+        for name in dict.fromkeys(names):
+            history = self.history(name)
+            rows.append({
+                "Name": name,
+                "Years": ", ".join(map(str, self.years(name))),
+                "Programmes": ", ".join(f"{p} ({len(y)})" for p, y in self.programme_overlap(name).items()),
+                "Longest Streak": self.longest_streak(name),
+                "Roles": ", ".join(dict.fromkeys(role for _, _, _, role, _ in history if role)),
+                "Entries": len(history),
+            })
+        return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Programmübergreifende Historie der Panel-Teilnahmen")
+    parser.add_argument("--db", default=PanelHistoryIndex.DEFAULT_PATH, help="Pfad zur SQLite-Datei")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = subparsers.add_parser("ingest", help="Arbeitsmappen (.xlsx) und panel-members-excel.xls einlesen")
+    ingest_parser.add_argument("paths", nargs="+")
+    show_parser = subparsers.add_parser("show", help="Historie einer Person anzeigen")
+    show_parser.add_argument("name")
+    args = parser.parse_args()
+
+    index = PanelHistoryIndex(args.db)
+    if args.command == "ingest":
+        for path in args.paths:
+            try:
+                if os.path.basename(path).startswith("panel-members-excel"):
+                    count = index.ingest_panel_members_excel(path)
+                else:
+                    count = index.ingest_workbook(path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"❌ {path}: {e}")
+                continue
+            print(f"✅ {path}: {count} Einträge")
+    else:
+        for record in index.history(args.name):
+            print(record)
+        print(f"Jahre: {index.years(args.name)}")
+        print(f"Serien: {index.streaks(args.name)}, Lücken: {index.gaps(args.name)}")
+        print(f"Rollenwechsel: {index.role_changes(args.name)}, Programme: {index.programme_overlap(args.name)}")
@@ -0,0 +1,106 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+import pandas as pd
+
+
+
+class PersonKey:
+    """
+    Kanonischer Personenschlüssel für alle Joins, Gruppierungen und Cache-Abfragen.
+
+    Namen kommen in vielen Schreibweisen vor („José García“, „Jose  Garcia“, „Geer, Sara van de“). Der Schlüssel
+    schreibt Umlaute um (ü -> ue), entfernt übrige Diakritika (NFKD), Satzzeichen und doppelte Leerzeichen, schreibt klein (casefold) und stellt die
+    Form „Nachname, Vorname“ auf „Vorname Nachname“ um, wobei Namenszusätze (van, de, von, ...) vor den Nachnamen
+    wandern. Einzelne Namen werden über einen LRU-Cache normalisiert, Spalten über ihre unterschiedlichen Werte.
+
+    Beispiel:
+        >>> PersonKey.of("Geer, Sara van de")
+        'sara van de geer'
+        >>> PersonKey.surname("sara van de geer")
+        'geer'
+        >>> df = PersonKey.add_column(df)  # einmal beim Laden, danach PersonKey.keys(df)
+    """
+
+    # Spalte, in der der Schlüssel beim Laden einer Tabelle einmal abgelegt wird
+    COLUMN = "Person Key"
+
+    # Deutsche Umlaute wie in der üblichen Umschrift („Müller“ = „Mueller“), vor dem Entfernen der Diakritika
+    UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "Ä": "Ae", "Ö": "Oe", "Ü": "Ue"})
+
+    # Namenszusätze, die zum Nachnamen gehören, aber nicht dessen Kern sind
+    PARTICLES = {"van", "von", "der", "den", "de", "del", "della", "di", "da", "das", "dos", "du", "des", "la", "le",
+                 "ten", "ter", "zu", "af", "av", "y", "e", "el", "al", "bin", "ibn", "st"}
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _normalize(name: str) -> str:
+        if "," in name:
+            # "Nachname, Vorname [Zusätze]" -> "Vorname Zusätze Nachname"
+            last, _, first = name.partition(",")
+            words = first.split()
+            particles = []
+            while words and words[-1].casefold() in PersonKey.PARTICLES:
+                particles.insert(0, words.pop())
+            name = " ".join(words + particles + [last])
+        return PersonKey._plain(name)
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _plain(text: str) -> str:
+        text = unicodedata.normalize("NFKD", unicodedata.normalize("NFC", text).translate(PersonKey.UMLAUTS))
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        text = re.sub(r"[^\w\s]", " ", text.casefold())
+        return " ".join(text.split())
+
+    @classmethod
+    def of(cls, name) -> str:
+        """Schlüssel eines einzelnen Namens ("" für leere Werte)."""
+        if name is None or (not isinstance(name, str) and pd.isna(name)):
+            return ""
+        return cls._normalize(str(name))
+
+    @classmethod
+    def plain(cls, value) -> str:
+        """Vergleichsform ohne Umstellung von Namensteilen, z. B. für Akronyme und Calls ("" für leere Werte)."""
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return ""
+        return cls._plain(str(value))
+
+    @classmethod
+    def surname(cls, key: str) -> str:
+        """Kern-Nachname eines Schlüssels ohne Namenszusätze ('sara van de geer' -> 'geer')."""
+        tokens = key.split()
+        core = [token for token in tokens[1:] if token not in cls.PARTICLES] or tokens[-1:]
+        return core[-1] if core else ""
+
+    @classmethod
+    def column(cls, names: pd.Series, plain: bool = False) -> pd.Series:
+        """
+        Schlüsselspalte als Categorical (jeder unterschiedliche Wert wird nur einmal normalisiert).
+
+        Mit `plain` wird nur die Schreibweise vereinheitlicht (siehe `plain`), z. B. für Akronym- und Call-Spalten.
+        """
+        normalize = cls.plain if plain else cls.of
+        keys = {name: normalize(name) for name in names.dropna().unique()}
+        return names.map(keys).fillna("").astype("category")
+
+    @classmethod
+    def add_column(cls, df: pd.DataFrame, name: str = "Name") -> pd.DataFrame:
+        """Legt die Schlüsselspalte `COLUMN` aus der Namensspalte an (einmal beim Laden der Tabelle)."""
+        df[cls.COLUMN] = cls.column(df[name])
+        return df
+
+    @classmethod
+    def keys(cls, df: pd.DataFrame, name: str = "Name") -> pd.Series:
+        """Schlüssel pro Zeile als Strings: die beim Laden angelegte Spalte, sonst aus der Namensspalte berechnet."""
+        if cls.COLUMN in df.columns:
+            return df[cls.COLUMN].astype(str)
+        return cls.column(df[name]).astype(str)
+
+    @staticmethod
+    def full_name(first: pd.Series, last: pd.Series) -> pd.Series:
+        """Anzeigename aus Vor- und Nachname (fehlende Teile werden ausgelassen, Leerzeichen bereinigt)."""
+        name = first.fillna("").astype(str) + " " + last.fillna("").astype(str)
+        return name.str.split().str.join(" ")
@@ -0,0 +1,117 @@
+import json
+import os
+import random
+import threading
+
+# eigene Module
+from cache_paths import CACHE_DIR
+from RandomFirefoxProfile import RandomFirefoxProfile
+
+
+
+class ProfileTemplates:
+    """
+    Kleine Menge wiederverwendbarer Firefox-Profilvorlagen mit gespeicherten Consent-Cookies.
+
+    Jede Vorlage hat eine feste Identität (User-Agent, Sprache) und merkt sich die Cookies des
+    Didomi-Privacy-Banners, sobald dieser einmal akzeptiert wurde. Pro Session wird aus einer Vorlage
+    ein frisches Profil erzeugt und die Consent-Cookies werden beim Start eingespielt, sodass das
+    Privacy-Banner nicht mehr geklickt werden muss.
+
+    Ablage: <ERC_CACHE_DIR>/firefox_templates/template_<n>.json
+
+    Beispiel:
+        >>> templates = ProfileTemplates.shared()
+        >>> template_id = templates.choose()
+        >>> profile = templates.create_profile(template_id, fast=True)
+        >>> templates.restore_cookies(driver, template_id)
+    """
+
+    DEFAULT_DIR = os.path.join(CACHE_DIR, "firefox_templates")
+
+    # Cookies, die die Einwilligung im Didomi-Banner speichern
+    CONSENT_COOKIE_PREFIXES = ("didomi", "euconsent")
+
+    # Leichte Seite auf der ResearchGate-Domain, um Cookies setzen zu können
+    COOKIE_URL = "https://www.researchgate.net/robots.txt"
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, base_dir: str = DEFAULT_DIR, count: int = 3):
+        self.base_dir = base_dir
+        self.count = count
+        self._lock = threading.Lock()
+        os.makedirs(base_dir, exist_ok=True)
+
+    @classmethod
+    def shared(cls) -> "ProfileTemplates":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _path(self, template_id: str) -> str:
+        return os.path.join(self.base_dir, f"{template_id}.json")
+
+    def _load(self, template_id: str) -> dict:
+        """Lädt eine Vorlage. Beim ersten Zugriff wird eine neue Identität ausgewürfelt und gespeichert."""
+        with self._lock:
+            try:
+                with open(self._path(template_id), encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                template = {
+                    "user_agent": random.choice(RandomFirefoxProfile.USER_AGENTS),
+                    "language": random.choice(RandomFirefoxProfile.LANGUAGES),
+                    "cookies": [],
+                }
+                self._write(template_id, template)
+                return template
+
+    def _write(self, template_id: str, template: dict) -> None:
+        tmp_path = self._path(template_id) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(template, f)
+        os.replace(tmp_path, self._path(template_id))
+
+    def choose(self) -> str:
+        """Wählt zufällig eine der Vorlagen."""
+        return f"template_{random.randrange(self.count)}"
+
+    def create_profile(self, template_id: str, fast: bool = False):
+        """Erzeugt ein frisches Firefox-Profil mit der festen Identität der Vorlage."""
+        template = self._load(template_id)
+        return RandomFirefoxProfile.create(fast=fast, user_agent=template["user_agent"], language=template["language"])
+
+    def has_consent(self, template_id: str) -> bool:
+        return bool(self._load(template_id)["cookies"])
+
+    def save_cookies(self, template_id: str, cookies: list[dict]) -> None:
+        """Speichert die Consent-Cookies einer Session in der Vorlage."""
+        consent = [
+            {k: c[k] for k in ("name", "value", "domain", "path", "secure", "expiry") if k in c}
+            for c in cookies
+            if c.get("name", "").startswith(self.CONSENT_COOKIE_PREFIXES)
+        ]
+        if not consent:
+            return
+        template = self._load(template_id)
+        template["cookies"] = consent
+        with self._lock:
+            self._write(template_id, template)
+        print(f"🍪 Consent-Cookies in {template_id} gespeichert")
+
+    def restore_cookies(self, driver, template_id: str) -> bool:
+        """Spielt die gespeicherten Consent-Cookies in eine neue Session ein."""
+        cookies = self._load(template_id)["cookies"]
+        if not cookies:
+            return False
+        try:
+            driver.get(self.COOKIE_URL)
+            for cookie in cookies:
+                driver.add_cookie(cookie)
+            return True
+        except Exception as e:
+            print(f"⚠️ Consent-Cookies konnten nicht gesetzt werden: {e}")
+            return False
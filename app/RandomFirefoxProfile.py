@@ -1,8 +1,8 @@
 import random
+import shutil
 
 # Driver for Firefox, Chrome, Edge, etc.
 from selenium import webdriver
-import tempfile
 
 
 
@@ -30,19 +30,28 @@ class RandomFirefoxProfile:
     ]
     
     @staticmethod
-    def create():
-        """Erstellt ein zufälliges Firefox-Profil."""
+    def create(fast: bool = False, user_agent: str | None = None, language: str | None = None):
+        """
+        Erstellt ein zufälliges Firefox-Profil.
+
+        Das Profil liegt in einem temporären Verzeichnis (`profile.path`), das nach dem Browserstart
+        mit `cleanup()` entfernt werden kann.
+
+        Args:
+            fast: Schnelles Profil, das Bilder, Medien, Webfonts sowie Werbe- und Tracking-Skripte blockiert
+            user_agent: Fester User-Agent (z. B. aus einer Profilvorlage), sonst zufällig
+            language: Feste Sprache (z. B. aus einer Profilvorlage), sonst zufällig
+        """
         
         # Temporäres Profil
-        temp_dir = tempfile.mkdtemp(prefix="firefox_")
-        profile = webdriver.FirefoxProfile(temp_dir)
+        profile = webdriver.FirefoxProfile()
         
         # Zufälliger User-Agent
-        user_agent = random.choice(RandomFirefoxProfile.USER_AGENTS)
+        user_agent = user_agent or random.choice(RandomFirefoxProfile.USER_AGENTS)
         profile.set_preference("general.useragent.override", user_agent)
         
         # Zufällige Sprache
-        language = random.choice(RandomFirefoxProfile.LANGUAGES)
+        language = language or random.choice(RandomFirefoxProfile.LANGUAGES)
         profile.set_preference("intl.accept_languages", language)
         
         # Download-Einstellungen
@@ -62,10 +71,44 @@ class RandomFirefoxProfile:
         # WebGL und Canvas Fingerprinting reduzieren
         profile.set_preference("webgl.disabled", random.choice([True, False]))
         profile.set_preference("privacy.resistFingerprinting", True)
+
+        if fast:
+            RandomFirefoxProfile.apply_fast_preferences(profile)
         
         print("🎲 Zufälliges Profil erstellt:")
         print(f"   User-Agent: {user_agent[:50]}...")
         print(f"   Sprache: {language}")
         print(f"   Auflösung: {width}x{height}")
+        print(f"   Fast-Modus: {fast}")
         
+        return profile
+
+    @staticmethod
+    def cleanup(profile) -> None:
+        """Löscht das temporäre Profilverzeichnis (der gestartete Browser arbeitet mit einer eigenen Kopie)."""
+        path = getattr(profile, "path", None)
+        if path:
+            shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def apply_fast_preferences(profile):
+        """Blockiert Ressourcen, die für das Auslesen der Skills nicht gebraucht werden."""
+        # Bilder und Medien
+        profile.set_preference("permissions.default.image", 2)
+        profile.set_preference("media.autoplay.default", 5)
+        profile.set_preference("media.autoplay.blocking_policy", 2)
+        profile.set_preference("media.peerconnection.enabled", False)
+        # Webfonts
+        profile.set_preference("browser.display.use_document_fonts", 0)
+        profile.set_preference("gfx.downloadable_fonts.enabled", False)
+        # Werbe-, Tracking- und Social-Skripte von Drittanbietern (strikter Inhaltsblocker)
+        profile.set_preference("browser.contentblocking.category", "strict")
+        profile.set_preference("privacy.trackingprotection.socialtracking.enabled", True)
+        profile.set_preference("privacy.trackingprotection.cryptomining.enabled", True)
+        profile.set_preference("privacy.trackingprotection.fingerprinting.enabled", True)
+        # Kein Prefetching, keine Hintergrunddienste
+        profile.set_preference("network.prefetch-next", False)
+        profile.set_preference("network.dns.disablePrefetch", True)
+        profile.set_preference("browser.cache.disk.enable", False)
+        profile.set_preference("dom.ipc.processCount", 1)
         return profile
\ No newline at end of file
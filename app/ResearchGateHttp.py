@@ -0,0 +1,225 @@
+import random
+import re
+import threading
+from collections import Counter
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+# eigene Module
+from CircuitBreaker import CircuitBreaker
+from PageArchive import PageArchive
+from ResearchGateSlugResolver import ResearchGateSlugResolver
+
+
+
+class ResearchGateHttp:
+    """
+    Leichter ResearchGate-Abruf ohne Browser (gepoolte HTTP-Session + BeautifulSoup).
+
+    Liefert die Skills wie `ResearchGateSelenium.find_skills`. Kommt eine Challenge-/Access-Denied-Seite
+    zurück oder fehlt der Skills-Bereich im HTML (z. B. weil er per JavaScript nachgeladen wird), ist
+    `needs_browser` True und der Aufrufer fällt auf Selenium zurück. Wie oft welcher Weg erfolgreich ist,
+    wird in `ResearchGateHttp.stats()` gezählt.
+
+    Beispiel:
+        >>> rg_http = ResearchGateHttp("Gregor Anderluh")
+        >>> skills = rg_http.find_skills()
+        >>> if rg_http.needs_browser:
+        ...     skills = ResearchGateSelenium("Gregor Anderluh").find_skills()
+        ...     ResearchGateHttp.record("selenium", "ok" if skills else "missing")
+    """
+
+    BASE_URL = "https://www.researchgate.net/"
+
+    USER_AGENTS = [
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+        "Mozilla/5.0 (X11; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:121.0) Gecko/20100101 Firefox/121.0",
+    ]
+
+    # Gleiche Bereiche wie in ResearchGateSelenium (nur CSS, BeautifulSoup kennt kein XPath)
+    SKILLS_SELECTORS = [
+        "div.nova-legacy-c-card:nth-child(4) > div:nth-child(2) > div:nth-child(1) > div:nth-child(1)",
+        "div.nova-legacy-c-card--spacing-xl div.nova-legacy-o-stack__item",
+    ]
+    SKILLS_HEADING = "Skills and Expertise"
+
+    # Merkmale von Bot-Challenges und Sperrseiten
+    CHALLENGE_MARKERS = ["<h1>Access denied</h1>", "cf-challenge", "challenge-platform", "Just a moment...", "captcha"]
+
+    _session = None
+    _session_lock = threading.Lock()
+    _stats = Counter()
+    _stats_lock = threading.Lock()
+
+    def __init__(self, name: str, timeout: float = 10, slug: str | None = None):
+        self.full_name = name
+        self.name = slug or name.replace(" ", "-")  # Profil-Slug (z. B. aus dem ResearchGateSlugResolver)
+        self.timeout = timeout
+        self.skills_missing = False  # True, wenn das Profil nicht existiert (404)
+        self.not_found = False  # True bei 404 (falsch geratener Slug)
+        self.wrong_person = False  # True, wenn das Profil einer anderen Person gehört
+        self.needs_browser = False  # True bei Challenge-Seite oder fehlendem Skills-Bereich
+        # HTTP-Weg nach wiederholten Challenges eine Weile überspringen und direkt den Browser nutzen
+        self.breaker = CircuitBreaker.for_host("www.researchgate.net (http)", threshold=5, cooldown=600)
+
+    @classmethod
+    def session(cls) -> requests.Session:
+        """Gemeinsame Session pro Prozess (Keep-Alive, Connection-Pool, Cookies)."""
+        with cls._session_lock:
+            if cls._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=1)
+                session.mount("https://", adapter)
+                session.headers.update({
+                    "User-Agent": random.choice(cls.USER_AGENTS),
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                    "Accept-Language": "en-US,en;q=0.8",
+                })
+                cls._session = session
+            return cls._session
+
+    @classmethod
+    def record(cls, path: str, outcome: str) -> None:
+        """Zählt ein Ergebnis pro Weg, z. B. ('http', 'ok') oder ('selenium', 'missing')."""
+        with cls._stats_lock:
+            cls._stats[f"{path}_{outcome}"] += 1
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Zähler pro Weg und Ergebnis seit Prozessstart."""
+        with cls._stats_lock:
+            return dict(cls._stats)
+
+    @classmethod
+    def is_challenge(cls, status_code: int, html: str) -> bool:
+        return status_code in (403, 429, 503) or any(marker in html for marker in cls.CHALLENGE_MARKERS)
+
+    @staticmethod
+    def parse_profile_name(html: str) -> str | None:
+        """Name der Person aus dem Seitentitel ("Name | Institution | ResearchGate")."""
+        title = BeautifulSoup(html, "html.parser").title
+        if title is None or not title.get_text(strip=True):
+            return None
+        return title.get_text(strip=True).split("|")[0].strip() or None
+
+    @classmethod
+    def search_profiles(cls, name: str, limit: int = 5) -> list[str]:
+        """
+        Sucht Profil-Slugs über die ResearchGate-Suche (ohne Browser).
+
+        Returns:
+            Slugs der Treffer, deren Linktext zum Namen passt (leere Liste bei Challenge oder Fehler)
+        """
+        url = f"{cls.BASE_URL}search/researcher"
+        try:
+            response = cls.session().get(url, params={"q": name}, timeout=10)
+        except requests.RequestException as e:
+            print(f"⚠️ ResearchGate-Suche fehlgeschlagen: {e}")
+            return []
+        # Suchseiten getrennt von Profilseiten archivieren, damit der Skills-Replay nur Profile sieht
+        PageArchive.capture("researchgate_search", response.url, response.text, status=response.status_code)
+        if response.status_code != 200 or cls.is_challenge(response.status_code, response.text):
+            return []
+
+        slugs = [slug for slug, link_text in cls.parse_search_results(response.text)
+                 if ResearchGateSlugResolver.matches(name, link_text)]
+        return list(dict.fromkeys(slugs))[:limit]
+
+    @staticmethod
+    def parse_search_results(html: str) -> list[tuple[str, str | None]]:
+        """Treffer einer Suchseite als Liste von (Slug, Linktext)."""
+        results = []
+        for link in BeautifulSoup(html, "html.parser").select('a[href*="profile/"]'):
+            match = re.search(r"profile/([^/?#]+)", link.get("href", ""))
+            if match:
+                results.append((match.group(1), link.get_text(" ", strip=True) or None))
+        return results
+
+    @classmethod
+    def parse_skills(cls, html: str) -> list[str] | None:
+        """
+        Liest die Skills aus dem Profil-HTML.
+
+        Zuerst wird die Karte mit der Überschrift "Skills and Expertise" gesucht, danach die CSS-Selektoren
+        aus `ResearchGateSelenium`. Gibt None zurück, wenn kein Skills-Bereich gefunden wurde.
+        """
+        soup = BeautifulSoup(html, "html.parser")
+
+        container = None
+        heading = soup.find(string=lambda text: text and text.strip() == cls.SKILLS_HEADING)
+        if heading is not None:
+            container = heading.find_parent("div", class_="nova-legacy-c-card") or heading.parent.parent
+        if container is None:
+            for selector in cls.SKILLS_SELECTORS:
+                container = soup.select_one(selector)
+                if container is not None:
+                    break
+        if container is None:
+            return None
+
+        skills = [
+            skill.strip()
+            for skill in container.get_text("\n").split("\n")
+            if skill.strip() and skill.strip() != cls.SKILLS_HEADING
+        ]
+        return list(dict.fromkeys(skills))
+
+    def find_skills(self) -> list[str] | None:
+        """Extrahiert Skills per HTTP. Bei None `needs_browser` bzw. `skills_missing` prüfen."""
+        self.needs_browser = False
+        self.skills_missing = False
+        self.not_found = False
+        self.wrong_person = False
+        if not self.breaker.allow():
+            self.needs_browser = True
+            self.record("http", "skipped")
+            return None
+
+        profile_url = f"{self.BASE_URL}profile/{self.name}"
+        print(f"🌐 HTTP: {profile_url}")
+        try:
+            response = self.session().get(profile_url, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"⚠️ HTTP-Abruf fehlgeschlagen: {e}")
+            self.needs_browser = True
+            self.record("http", "error")
+            return None
+        PageArchive.capture("researchgate", profile_url, response.text, status=response.status_code)
+
+        if response.status_code == 404:
+            print("❌ Profil existiert nicht (404)")
+            self.skills_missing = True
+            self.not_found = True
+            self.breaker.record_success()
+            self.record("http", "not_found")
+            return None
+
+        if self.is_challenge(response.status_code, response.text):
+            print("⚠️ Challenge-Seite erhalten – Browser wird benötigt")
+            self.needs_browser = True
+            self.breaker.record_failure()
+            self.record("http", "challenge")
+            return None
+        self.breaker.record_success()
+
+        profile_name = self.parse_profile_name(response.text)
+        if not ResearchGateSlugResolver.matches(self.full_name, profile_name):
+            print(f"❌ Profil gehört zu '{profile_name}', nicht zu '{self.full_name}'")
+            self.skills_missing = True
+            self.wrong_person = True
+            self.record("http", "wrong_person")
+            return None
+
+        skills = self.parse_skills(response.text)
+        if not skills:
+            print("ℹ️ Skills-Bereich nicht im HTML – Browser wird benötigt")
+            self.needs_browser = True
+            self.record("http", "missing")
+            return None
+
+        print(f"✅ {len(skills)} Skills per HTTP gefunden")
+        self.record("http", "ok")
+        return skills
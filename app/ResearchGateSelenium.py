@@ -1,55 +1,65 @@
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
+import re
 from random import uniform
 from time import sleep
+from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 
 
 # eigene Module
-from RandomFirefoxProfile import RandomFirefoxProfile
+from CircuitBreaker import CircuitBreaker
+from PageArchive import PageArchive
+from ProfileTemplates import ProfileTemplates
+from WebDriverPool import WebDriverPool
 
 class ResearchGateSelenium:
 
-    def __init__(self, name: str = "Gregor-Anderluh", headless: bool = True):
+    # Mögliche Selektoren für den Bereich "Skills and Expertise"
+    SKILLS_SELECTORS = [
+        (By.CSS_SELECTOR, "div.nova-legacy-c-card:nth-child(4) > div:nth-child(2) > div:nth-child(1) > div:nth-child(1)"),
+        (By.XPATH, "/html/body/div[2]/main/section[3]/div/div[2]/div[2]/div/div"),
+        (By.CSS_SELECTOR, "div.nova-legacy-c-card--spacing-xl div.nova-legacy-o-stack__item"),
+    ]
+    SKILLS_HEADING = "Skills and Expertise"
+
+    def __init__(self, name: str = "Gregor-Anderluh", headless: bool = True, driver_pool: WebDriverPool | None = None,
+                 fast: bool = True, slug: str | None = None):
         self.BASE_URL = 'https://www.researchgate.net/'
-        self.name = name.replace(" ", "-")
+        self.name = slug or name.replace(" ", "-")  # Profil-Slug (z. B. aus dem ResearchGateSlugResolver)
         self.headless = headless
+        self.fast = fast  # Ressourcen blockieren, "eager" laden und nur explizit auf den Skills-Bereich warten
         self.driver = None
+        self.driver_pool = driver_pool  # Optional: Browser aus einem Pool ausleihen statt neu zu starten
+        self._driver_broken = False
+        self.skills_missing = False  # True, wenn die Seite geladen wurde, aber keine Skills vorhanden sind
+        self.access_denied = False  # True, wenn ResearchGate die Anfrage gesperrt hat (später erneut versuchen)
+        self.temporary_failure = False  # True, wenn kein Browser verfügbar war oder die Seite nicht geladen wurde
+        self.breaker = CircuitBreaker.for_host("www.researchgate.net")
     
     def get_driver(self):
-        """Initialisiert den Firefox WebDriver."""
+        """Initialisiert den Firefox WebDriver (aus dem Pool, falls vorhanden)."""
         if self.driver is not None:
             return self.driver
-        
-        options = webdriver.FirefoxOptions()
-        if self.headless:
-            options.add_argument("--headless")
-
-        # Docker-spezifische Optionen
-        options.add_argument("--no-sandbox") # Notwendig in Docker-Umgebungen
-        options.add_argument("--disable-dev-shm-usage") # Verhindert Probleme mit gemeinsam genutztem Speicher
-
-        profile = RandomFirefoxProfile.create()
-        options.profile = profile
 
+        self._driver_broken = False
         try:
-            service = Service(executable_path="/usr/local/bin/geckodriver")
-            self.driver = webdriver.Firefox(options=options, service=service)
+            if self.driver_pool is not None:
+                self.driver = self.driver_pool.acquire()
+            else:
+                self.driver = WebDriverPool.create_driver(self.headless, self.fast)
         except Exception as e:
             print(f"⚠️ Fehler beim Starten des WebDrivers: {e}")
-        
-        try:
-            self.driver = webdriver.Firefox(options=options)
-        except Exception as e:
-                print(f"⚠️ Fehler beim Starten des WebDrivers: {e}")
 
         return self.driver
     
     def close_driver(self):
-        """Beendet den WebDriver sicher."""
-        if self.driver is not None:
+        """Beendet den WebDriver sicher bzw. gibt ihn an den Pool zurück."""
+        if self.driver is not None and self.driver_pool is not None:
+            self.driver_pool.release(self.driver, broken=self._driver_broken)
+            self.driver = None
+        elif self.driver is not None:
             try:
                 self.driver.quit()
                 self.driver = None
@@ -79,6 +89,9 @@ class ResearchGateSelenium:
     def klick_privacy_accept(self):
         """Klickt auf Privacy-Accept-Button."""
         try:
+            # Einwilligung ist bereits als Cookie vorhanden (warmer Browser oder aus der Profilvorlage)
+            if self.driver and self.driver.get_cookie("didomi_token"):
+                return
             self.random_sleep(1, 2)
             wait = WebDriverWait(self.driver, 10) if self.driver else None
             agree_button = wait.until(
@@ -86,49 +99,154 @@ class ResearchGateSelenium:
             ) if wait else None
             agree_button.click() if agree_button else None
             print("✅ Privacy-Banner akzeptiert")
+            # Consent-Cookies in der Profilvorlage speichern, damit künftige Sessions das Banner überspringen
+            template_id = getattr(self.driver, "profile_template", None)
+            if agree_button and template_id:
+                ProfileTemplates.shared().save_cookies(template_id, self.driver.get_cookies())
         except Exception as e:
             print(f"ℹ️ Kein Privacy-Banner gefunden (bereits akzeptiert?)")
     
+    def wait_for_skills(self, timeout: float = 10):
+        """
+        Wartet explizit auf den Skills-Bereich oder eine Access-Denied-Seite.
+
+        Returns:
+            Das gefundene WebElement, "access_denied" oder None nach Ablauf des Timeouts
+        """
+        def locate(driver):
+            for by, selector in self.SKILLS_SELECTORS:
+                elements = driver.find_elements(by, selector)
+                if elements:
+                    return elements[0]
+            if "<h1>Access denied</h1>" in driver.page_source:
+                return "access_denied"
+            return False
+
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.25).until(locate)
+        except TimeoutException:
+            return None
+
+    def page_loaded(self) -> bool:
+        """True, wenn eine ResearchGate-Seite tatsächlich gerendert wurde (nicht leer oder halb geladen)."""
+        try:
+            ready = self.driver.execute_script("return document.readyState") in ("interactive", "complete")
+            return ready and "ResearchGate" in (self.driver.title or "")
+        except Exception:
+            return False
+
+    @property
+    def should_retry(self) -> bool:
+        """True bei Sperre oder vorübergehendem Fehler: der Name soll später erneut versucht werden."""
+        return self.access_denied or self.temporary_failure
+
+    @staticmethod
+    def skills_from_text(text: str) -> list[str]:
+        """Zerlegt den Text des Skills-Bereichs in eine Liste (ohne Überschrift und Leerzeilen)."""
+        return [
+            skill.strip()
+            for skill in text.split('\n')
+            if skill.strip() and skill.strip() != ResearchGateSelenium.SKILLS_HEADING
+        ]
+
+    @staticmethod
+    def xpath_to_css(xpath: str) -> str:
+        """
+        Übersetzt einen absoluten XPath aus Tag-Namen und Positionen in einen CSS-Selektor.
+
+        Beispiel:
+            >>> ResearchGateSelenium.xpath_to_css("/html/body/div[2]/main")
+            'html > body > div:nth-of-type(2) > main'
+        """
+        steps = []
+        for step in xpath.strip("/").split("/"):
+            match = re.fullmatch(r"([a-zA-Z][\w-]*)(?:\[(\d+)\])?", step)
+            if match is None:
+                raise ValueError(f"Nicht unterstützter XPath-Schritt: {step}")
+            tag, position = match.groups()
+            steps.append(f"{tag}:nth-of-type({position})" if position else tag)
+        return " > ".join(steps)
+
+    @classmethod
+    def parse_skills_html(cls, html: str) -> list[str] | None:
+        """
+        Wendet die `SKILLS_SELECTORS` auf archiviertes HTML an (ohne Browser), z. B. für `PageArchive.replay`.
+
+        Liefert dasselbe Ergebnis wie `find_skills` für die gerenderte Seite: None, wenn kein Selektor passt.
+        """
+        soup = BeautifulSoup(html, "html.parser")
+        for by, selector in cls.SKILLS_SELECTORS:
+            element = soup.select_one(cls.xpath_to_css(selector) if by == By.XPATH else selector)
+            if element is not None:
+                return cls.skills_from_text(element.get_text("\n"))
+        return None
+
+    def retry_delay(self) -> float:
+        """Wartezeit bis zum nächsten Versuch nach einer Sperre (mindestens 15–20 Sekunden)."""
+        return max(uniform(15, 20), self.breaker.remaining())
+
     def find_skills(self):
-        """Extrahiert Skills vom ResearchGate-Profil."""
-        
+        """
+        Extrahiert Skills vom ResearchGate-Profil.
+
+        Bei Access Denied oder offenem Circuit Breaker wird nicht gewartet, sondern None zurückgegeben
+        und `access_denied` gesetzt; der Aufrufer entscheidet, wann der Name erneut versucht wird.
+        Startet kein Browser oder wird die Seite nicht geladen, ist `temporary_failure` gesetzt.
+        `skills_missing` wird nur gesetzt, wenn die Profilseite geladen wurde und keine Skills enthält.
+        """
+        self.access_denied = False
+        self.temporary_failure = False
+        self.skills_missing = False
+        if not self.breaker.allow():
+            print(f"🚧 ResearchGate pausiert – '{self.name}' wird später erneut versucht")
+            self.access_denied = True
+            return None
+
         # 1. Driver initialisieren
-        self.get_driver()
+        if self.get_driver() is None:
+            print("⚠️ Kein Browser verfügbar – Name wird später erneut versucht")
+            self.temporary_failure = True
+            return None
         
         # 2. Zur Profilseite navigieren
         profile_url = f"{self.BASE_URL}profile/{self.name}"
         print(f"🌐 Öffne: {profile_url}")
         
         try:
-            self.driver.get(profile_url) if self.driver else None
-            self.driver.implicitly_wait(10) if self.driver else None
+            self.driver.get(profile_url)
+            # Fast-Modus: keine implizite Wartezeit, nur explizit auf den Skills-Bereich warten
+            self.driver.implicitly_wait(0 if self.fast else 10)
             
             # 3. Privacy-Banner akzeptieren
             self.klick_privacy_accept()
-            self.random_sleep(2, 4)
+            if not self.fast:
+                self.random_sleep(2, 4)
             #self.driver.refresh()
+
+            introduction = self.wait_for_skills() if self.fast else None
+            # Gerenderte Seite archivieren, damit Selektor-Änderungen offline geprüft werden können
+            PageArchive.capture("researchgate", profile_url, self.driver.page_source)
             
             # 4. Access Denied prüfen
-            if self.access_denied_check():
-                
-                self.close_driver()
-                sleep_time = uniform(15, 20)
-                print(f"⚠️ Zugriff verweigert. Warte {round(sleep_time, 1)} Sekunden...")
-                sleep(sleep_time)
-                return self.find_skills()  # Rekursiver Aufruf
+            if introduction == "access_denied" or self.access_denied_check():
+                self._driver_broken = True  # Browser mit neuer Identität ersetzen
+                self.access_denied = True
+                self.breaker.record_failure()
+                print("⚠️ Zugriff verweigert – Name wird später erneut versucht")
+                return None
+
+            # Zeitüberschreitung ohne gerenderte Seite ist kein echter Miss
+            if introduction is None and not self.page_loaded():
+                print("⚠️ Profilseite nicht geladen – Name wird später erneut versucht")
+                self._driver_broken = True
+                self.temporary_failure = True
+                return None
+            self.breaker.record_success()
             
             # 5. Skills-Element finden (mehrere Selektoren probieren)
-            introduction = None
-            
-            selectors = [
-                (By.CSS_SELECTOR, "div.nova-legacy-c-card:nth-child(4) > div:nth-child(2) > div:nth-child(1) > div:nth-child(1)"),
-                (By.XPATH, "/html/body/div[2]/main/section[3]/div/div[2]/div[2]/div/div"),
-                (By.CSS_SELECTOR, "div.nova-legacy-c-card--spacing-xl div.nova-legacy-o-stack__item"),
-            ]
-            
-            for by, selector in selectors:
+            for by, selector in (self.SKILLS_SELECTORS if introduction is None else []):
                 try:
-                    introduction = self.driver.find_element(by, selector) if self.driver else None
+                    introduction = self.driver.find_element(by, selector)
                     print(f"✅ Element gefunden mit: {by} - {selector[:50]}...")
                     break
                 except Exception:
@@ -136,27 +254,27 @@ class ResearchGateSelenium:
             
             if not introduction:
                 print("❌ Skills-Bereich nicht gefunden")
+                self.skills_missing = True
                 return None
             
             # 6. Text extrahieren
             introduction_text = introduction.text
             
             # 7. In Liste konvertieren
-            skills_list = [
-                skill.strip() 
-                for skill in introduction_text.split('\n') 
-                if skill.strip() and skill.strip() != 'Skills and Expertise'
-            ]
+            skills_list = self.skills_from_text(introduction_text)
             
             print(f"✅ {len(skills_list)} Skills gefunden")
+            self.skills_missing = not skills_list
             return skills_list
         
         except Exception as e:
             print(f"❌ Fehler beim Abrufen der Skills: {e}")
+            self._driver_broken = True
+            self.temporary_failure = True
             import traceback
             traceback.print_exc()
             return None
         
         finally:
-            # 8. Driver schließen (immer!)
-            self.close_driver()
\ No newline at end of file
+            # 8. Driver schließen bzw. an den Pool zurückgeben (immer!)
+            self.close_driver()
@@ -0,0 +1,139 @@
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+
+# eigene Module
+from cache_paths import CACHE_DIR
+from PersonKey import PersonKey
+
+
+class ResearchGateSlugResolver:
+    """
+    Zuordnung Name -> geprüfter ResearchGate-Profil-Slug (z. B. "Sara van de Geer" -> "Sara-Van-De-Geer").
+
+    Bisher wurde der Slug immer als `name.replace(" ", "-")` geraten. Bei Namenszusätzen, Diakritika oder
+    Namensdoppelungen führt das zu 404-Seiten oder zur falschen Person. Der Resolver merkt sich:
+    - 'verified': Slugs, unter denen das Profil erfolgreich geladen wurde (direkter Treffer beim nächsten Mal)
+    - 'bad': geratene Slugs, die nicht existieren oder zu einer anderen Person gehören (werden übersprungen)
+    - 'search': Treffer aus der ResearchGate-Suche, die noch nicht geprüft wurden
+
+    Gefüllt wird er durch erfolgreiche Seitenaufrufe und durch die ResearchGate-Suche (`add_search_results`).
+
+    Beispiel:
+        >>> resolver = ResearchGateSlugResolver()
+        >>> resolver.candidates("José García")
+        ['José-García', 'Jose-Garcia']
+        >>> resolver.record_verified("José García", "Jose-Garcia-12")
+        >>> resolver.candidates("José García")
+        ['Jose-Garcia-12']
+    """
+
+    DEFAULT_PATH = os.path.join(CACHE_DIR, "researchgate_slugs.db")
+
+    def __init__(self, db_path: str = DEFAULT_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS slugs (
+                    key TEXT NOT NULL,
+                    slug TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    source TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (key, slug)
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _key(name: str) -> str:
+        """Kanonischer Personenschlüssel (siehe `PersonKey`)."""
+        return PersonKey.of(name)
+
+    @staticmethod
+    def guesses(name: str) -> list[str]:
+        """Geratene Slugs in absteigender Wahrscheinlichkeit (bisheriges Schema zuerst)."""
+        words = name.split()
+        ascii_words = unicodedata.normalize("NFKD", " ".join(words)).encode("ascii", "ignore").decode().split()
+        candidates = [
+            "-".join(words),
+            "-".join(ascii_words),
+            "-".join(w[:1].upper() + w[1:] for w in ascii_words),  # ResearchGate schreibt Namenszusätze groß
+            "-".join(re.sub(r"[^\w]", "", w) for w in ascii_words if re.sub(r"[^\w]", "", w)),
+        ]
+        return [slug for slug in dict.fromkeys(candidates) if slug]
+
+    def verified(self, name: str) -> str | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT slug FROM slugs WHERE key = ? AND status = 'verified' ORDER BY updated_at DESC LIMIT 1",
+                (self._key(name),),
+            ).fetchone()
+        return row[0] if row else None
+
+    def bad(self, name: str) -> set[str]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT slug FROM slugs WHERE key = ? AND status = 'bad'", (self._key(name),)).fetchall()
+        return {row[0] for row in rows}
+
+    def searched(self, name: str) -> list[str]:
+        """Noch nicht geprüfte Slugs aus der ResearchGate-Suche."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT slug FROM slugs WHERE key = ? AND status = 'search' ORDER BY updated_at",
+                (self._key(name),),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def candidates(self, name: str) -> list[str]:
+        """
+        Slugs, die nacheinander probiert werden sollen.
+
+        Ein geprüfter Slug wird allein zurückgegeben. Sonst Suchtreffer und geratene Slugs ohne bekannte Fehlversuche.
+        Eine leere Liste bedeutet: alle bekannten Varianten sind falsch, kein Seitenaufruf nötig.
+        """
+        slug = self.verified(name)
+        if slug:
+            return [slug]
+        bad = self.bad(name)
+        return [slug for slug in dict.fromkeys(self.searched(name) + self.guesses(name)) if slug not in bad]
+
+    def _set(self, name: str, slug: str, status: str, source: str | None = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO slugs (key, slug, status, source, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (self._key(name), slug, status, source, time.time()),
+            )
+
+    def record_verified(self, name: str, slug: str, source: str = "visit") -> None:
+        self._set(name, slug, "verified", source)
+
+    def record_bad(self, name: str, slug: str, reason: str = "not_found") -> None:
+        self._set(name, slug, "bad", reason)
+
+    def add_search_results(self, name: str, slugs: list[str]) -> None:
+        """Übernimmt Slugs aus der ResearchGate-Suche, sofern sie noch nicht bekannt sind."""
+        known = self.bad(name) | {self.verified(name)}
+        for slug in slugs:
+            if slug not in known:
+                self._set(name, slug, "search", "search")
+
+    @classmethod
+    def matches(cls, name: str, profile_name: str | None) -> bool:
+        """Prüft, ob der Profilname zur gesuchten Person passt (Nachname muss vorkommen)."""
+        if not profile_name:
+            return True  # Kein Name auf der Seite erkennbar: nicht als falsche Person werten
+        wanted = cls._key(name).split()
+        found = set(cls._key(profile_name).split())
+        return bool(wanted) and wanted[-1] in found
+
+    def clear(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM slugs").rowcount
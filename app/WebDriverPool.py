@@ -0,0 +1,174 @@
+import os
+import queue
+import threading
+import time
+
+from selenium import webdriver
+from selenium.webdriver.firefox.service import Service
+
+# eigene Module
+from ProfileTemplates import ProfileTemplates
+from RandomFirefoxProfile import RandomFirefoxProfile
+
+
+
+class WebDriverPool:
+    """
+    Pool mit N vorgewärmten Firefox-Instanzen für ResearchGate-Abfragen.
+
+    Statt für jeden Namen einen neuen Browser zu starten, wird pro Abfrage ein laufender Browser
+    ausgeliehen und danach zurückgegeben. Ein Browser wird neu gestartet, wenn er `max_pages` Seiten
+    geladen hat oder als defekt gemeldet wird (z. B. nach Access Denied oder WebDriver-Fehlern).
+
+    Beispiel:
+        >>> pool = WebDriverPool.shared(size=2, max_pages=25)
+        >>> driver = pool.acquire()
+        >>> try:
+        ...     driver.get("https://www.researchgate.net/profile/Gregor-Anderluh")
+        ... finally:
+        ...     pool.release(driver)
+    """
+
+    GECKODRIVER_PATH = "/usr/local/bin/geckodriver"
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, size: int = 2, max_pages: int = 25, headless: bool = True, fast: bool = True,
+                 acquire_timeout: float = 300):
+        self.size = size
+        self.max_pages = max_pages
+        self.headless = headless
+        self.fast = fast
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.LifoQueue()  # LIFO: zuletzt genutzter (warmer) Browser zuerst
+        self._pages = {}  # id(driver) -> Anzahl geladener Seiten
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, **kwargs) -> "WebDriverPool":
+        """Gemeinsamer Pool pro Prozess (wird beim ersten Aufruf angelegt)."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(**kwargs)
+            else:
+                if kwargs.get("size", 0) > cls._shared.size:
+                    cls._shared.size = kwargs["size"]  # Pool darf wachsen, z. B. bei mehr parallelen Suchen
+                if kwargs.get("max_pages"):
+                    cls._shared.max_pages = kwargs["max_pages"]  # gilt ab dem nächsten Zurückgeben eines Browsers
+            return cls._shared
+
+    @staticmethod
+    def create_driver(headless: bool = True, fast: bool = False):
+        """
+        Startet einen Firefox WebDriver mit einem Profil aus einer zufälligen Profilvorlage.
+
+        Im Fast-Modus werden Bilder, Medien, Fonts und Tracker blockiert und die Seite gilt schon
+        nach dem DOM-Aufbau als geladen (Page-Load-Strategie "eager").
+
+        Gespeicherte Consent-Cookies der Vorlage werden direkt nach dem Start eingespielt; die Vorlage
+        steht danach in `driver.profile_template`. Das lokale Profilverzeichnis wird nach dem Start
+        gelöscht, da Firefox mit einer eigenen Kopie arbeitet, die beim Beenden entfernt wird.
+        """
+        options = webdriver.FirefoxOptions()
+        if headless:
+            options.add_argument("--headless")
+        if fast:
+            options.page_load_strategy = "eager"
+
+        # Docker-spezifische Optionen
+        options.add_argument("--no-sandbox") # Notwendig in Docker-Umgebungen
+        options.add_argument("--disable-dev-shm-usage") # Verhindert Probleme mit gemeinsam genutztem Speicher
+
+        templates = ProfileTemplates.shared()
+        template_id = templates.choose()
+        options.profile = templates.create_profile(template_id, fast=fast)
+
+        try:
+            # Geckodriver aus dem Docker-Image bevorzugen, sonst Selenium Manager nutzen (nur ein Browserstart)
+            if os.path.exists(WebDriverPool.GECKODRIVER_PATH):
+                service = Service(executable_path=WebDriverPool.GECKODRIVER_PATH)
+                driver = webdriver.Firefox(options=options, service=service)
+            else:
+                driver = webdriver.Firefox(options=options)
+        finally:
+            RandomFirefoxProfile.cleanup(options.profile)
+
+        driver.profile_template = template_id
+        templates.restore_cookies(driver, template_id)
+        return driver
+
+    @staticmethod
+    def _is_alive(driver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver) -> None:
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"⚠️ Fehler beim Schließen: {e}")
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self._created -= 1
+
+    def acquire(self):
+        """Leiht einen Browser aus. Startet einen neuen, solange der Pool nicht voll ist."""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    return self._start_driver()
+                if time.monotonic() > deadline:
+                    raise TimeoutError("Kein freier Browser im WebDriverPool verfügbar")
+                try:
+                    # Kurz warten und erneut prüfen, da ein defekter Browser auch einen freien Platz schafft
+                    driver = self._idle.get(timeout=1)
+                except queue.Empty:
+                    continue
+
+            if self._is_alive(driver):
+                return driver
+            self._quit(driver)
+
+    def _start_driver(self):
+        try:
+            driver = self.create_driver(self.headless, self.fast)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            self._pages[id(driver)] = 0
+        print(f"🔥 Neuer Browser im Pool ({self._created}/{self.size})")
+        return driver
+
+    def release(self, driver, broken: bool = False) -> None:
+        """Gibt einen Browser zurück. Defekte oder verbrauchte Browser werden beendet."""
+        if driver is None:
+            return
+        with self._lock:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+            exhausted = self._pages[id(driver)] >= self.max_pages
+        if broken or exhausted:
+            self._quit(driver)
+        else:
+            self._idle.put(driver)
+
+    def close_all(self) -> None:
+        """Beendet alle freien Browser (z. B. beim Herunterfahren)."""
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                break
@@ -0,0 +1,7 @@
+import os
+from pathlib import Path
+
+
+# Gemeinsames Cache-Verzeichnis (SQLite-Caches, Journal, Seitenarchiv, Firefox-Vorlagen).
+# Standard ist <Repository>/data/cache, unabhängig vom Arbeitsverzeichnis; ERC_CACHE_DIR überschreibt es.
+CACHE_DIR = os.getenv("ERC_CACHE_DIR") or str(Path(__file__).resolve().parent.parent / "data" / "cache")
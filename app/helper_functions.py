@@ -1,6 +1,11 @@
-import requests
+import ast
+import os
+import re
+from functools import lru_cache
 # import ollama
-import pycountry
+import pandas as pd
+from pathlib import Path
+from pprint import pprint
 
 # Driver for Firefox, Chrome, Edge, etc.
 
@@ -11,11 +16,59 @@ import pycountry
 # Methods for dropdown
 
 # eigene Module
-from ORCIDClient import ORCIDClient
+# requests, pycountry, BeautifulSoup (ResearchGateHttp, ORCIDClient) und Selenium werden erst im jeweiligen
+# Codepfad geladen, damit der Start der Streamlit-App schnell bleibt
+from JobRunner import RetryLater
+from NegativeCache import NegativeCache
+from OpenAlexAuthorIndex import OpenAlexAuthorIndex
+from PageArchive import PageArchive
+from PersonKey import PersonKey
+from ResearchGateSlugResolver import ResearchGateSlugResolver
+
+# Resolver-Modus für die ORCID-Suche:
+# "online" (nur OpenAlex-API), "index_first" (lokaler Index, dann API), "offline" (nur lokaler Index)
+RESOLVER_MODE = os.getenv("ERC_RESOLVER_MODE", "index_first")
+
+
+# Die SQLite-Stores werden erst beim ersten Zugriff geöffnet, damit der Import keine Dateien anlegt
+@lru_cache(maxsize=1)
+def get_negative_cache() -> NegativeCache:
+    """Fehlschläge pro Provider (OpenAlex, ResearchGate) mit eigener TTL."""
+    return NegativeCache()
+
+
+@lru_cache(maxsize=1)
+def get_slug_resolver() -> ResearchGateSlugResolver:
+    """Name -> geprüfter ResearchGate-Profil-Slug."""
+    return ResearchGateSlugResolver()
+
+
+@lru_cache(maxsize=1)
+def get_openalex_index() -> OpenAlexAuthorIndex:
+    """Lokaler OpenAlex-Autorenindex für die ORCID-Suche."""
+    return OpenAlexAuthorIndex()
+
+# Anzahl der OpenAlex-Kandidaten, die pro Namenssuche bewertet werden
+OPENALEX_TOP_K = 10
+
+STOPWORDS = {"and", "of", "the", "in", "for", "from", "to", "its", "their", "on", "with", "university", "institute"}
+
+
+def load_panel_dict(path: Path = Path(__file__).resolve().parent.parent / "config" / "panel_dict.conf") -> dict:
+    """Lädt die ERC-Panelnamen (z. B. 'PE10' -> 'Earth System Science (PE10)') aus config/panel_dict.conf."""
+    try:
+        text = Path(path).read_text(encoding="utf-8")
+        return ast.literal_eval(text.split("=", 1)[1].strip())
+    except (OSError, IndexError, ValueError, SyntaxError):
+        return {}
+
+
+PANEL_DICT = load_panel_dict()
 # -----------------------------
 # Hilfsfunktionen
 # -----------------------------
 def fetch_openalex_id(name: str) -> dict | None:
+    import requests
     search_name = name.replace(" ", "+")
     base_url = f"https://api.openalex.org/authors?filter=display_name.search:{search_name}"
     response = requests.get(base_url)
@@ -74,28 +127,225 @@ def fetch_openalex_id(name: str) -> dict | None:
 #     response = ollama.chat(model=model, messages=[{"role": "user", "content": prompt}])
 #     return response["message"]["content"] if "message" in response else str(response)
 
+# Schreibweisen aus ERC-Exporten, die pycountry nicht kennt (ERC nutzt z. B. "UK" und "EL" als Ländercodes)
+ERC_COUNTRY_ALIASES = {
+    "UK": "GB", "EL": "GR", "XK": "XK", "Kosovo": "XK",
+    "Russia": "RU", "Turkey": "TR", "Palestine": "PS", "Macedonia": "MK", "Former Yugoslav Republic of Macedonia": "MK",
+    "The Netherlands": "NL", "Netherlands (the)": "NL", "Czech Republic": "CZ", "Slovak Republic": "SK",
+    "Great Britain": "GB", "England": "GB", "Scotland": "GB", "Wales": "GB", "Northern Ireland": "GB",
+    "USA": "US", "United States of America": "US", "Korea": "KR", "Republic of Korea": "KR",
+    "Cape Verde": "CV", "Ivory Coast": "CI", "Swaziland": "SZ", "Burma": "MM", "Vatican": "VA",
+}
+
+
+def _country_key(name) -> str:
+    return " ".join(str(name).split()).casefold()
+
+
+@lru_cache(maxsize=1)
+def country_code_table() -> dict[str, str]:
+    """
+    Einmalig aufgebaute Tabelle Ländername -> ISO-Alpha-2-Code.
+
+    Enthält Alpha-2-, Alpha-3- und numerische Codes, Namen, offizielle und gebräuchliche Namen aus pycountry
+    sowie ERC-spezifische Schreibweisen (`ERC_COUNTRY_ALIASES`). Schlüssel sind kleingeschrieben.
+    """
+    import pycountry
+    table = {}
+    for country in pycountry.countries:
+        for attribute in ("alpha_2", "alpha_3", "numeric", "name", "official_name", "common_name"):
+            value = getattr(country, attribute, None)
+            if value:
+                table[_country_key(value)] = country.alpha_2
+    table.update({_country_key(alias): code for alias, code in ERC_COUNTRY_ALIASES.items()})
+    return table
+
+
 # Funktion, um den ISO-Alpha-2-Code zu bekommen
 def get_country_code(name):
-    try:
-        return pycountry.countries.lookup(name).alpha_2
-    except LookupError:
-        return None  # Falls kein Land gefunden wird
+    if name is None or pd.isna(name):
+        return None
+    return country_code_table().get(_country_key(name))  # None, falls kein Land gefunden wird
+
+
+def map_country_codes(series: pd.Series) -> pd.Series:
+    """
+    Wandelt eine Spalte mit Ländernamen in ISO-Alpha-2-Codes um.
+
+    Jeder unterschiedliche Wert wird nur einmal nachgeschlagen, danach wird vektorisiert gemappt.
+    Nicht erkannte Länder werden zu None.
+    """
+    codes = {value: get_country_code(value) for value in series.dropna().unique()}
+    return series.map(codes).astype(object).where(lambda s: s.notna(), None)
+
+def _tokens(text) -> set[str]:
+    """Zerlegt einen Text in kleingeschriebene Wörter ohne Stoppwörter."""
+    if not isinstance(text, str):
+        return set()
+    return {t for t in re.findall(r"\w+", text.casefold()) if len(t) > 2 and t not in STOPWORDS}
+
+
+def score_openalex_candidate(candidate: dict, context: dict | None = None, rank: int = 0, top_k: int = OPENALEX_TOP_K) -> float:
+    """
+    Bewertet einen OpenAlex-Autor anhand der bekannten Informationen aus der Excel-Datei.
+
+    Berücksichtigt werden Host-Institution, Land, ERC-Panel (Panelname aus config/panel_dict.conf)
+    und die Fields der anderen Panel-Mitglieder. Die OpenAlex-Reihenfolge dient als Tiebreaker.
 
-def fetch_openalex_orcid_only(name: str) -> str | None:
+    Args:
+        candidate: Ein Eintrag aus `results` der OpenAlex-Autorensuche
+        context: Optional mit 'institution', 'country', 'panel', 'panel_keywords'
+        rank: Position des Kandidaten in der OpenAlex-Antwort
+        top_k: Anzahl der bewerteten Kandidaten
+
+    Returns:
+        Score als float (höher = besser)
+    """
+    context = context or {}
+    score = 0.5 * (top_k - rank) / top_k
+
+    institutions = list(candidate.get("last_known_institutions") or [])
+    institutions += [a.get("institution") or {} for a in candidate.get("affiliations") or []]
+
+    institution_tokens = _tokens(context.get("institution"))
+    if institution_tokens:
+        best_overlap = max(
+            (len(institution_tokens & _tokens(inst.get("display_name"))) / len(institution_tokens) for inst in institutions),
+            default=0.0,
+        )
+        score += 3.0 * best_overlap
+
+    country = context.get("country")
+    if country and any(inst.get("country_code") == country for inst in institutions):
+        score += 2.0
+
+    topic_tokens = set()
+    for topic in candidate.get("topics") or []:
+        topic_tokens |= _tokens(topic.get("display_name"))
+        for level in ("subfield", "field", "domain"):
+            topic_tokens |= _tokens((topic.get(level) or {}).get("display_name"))
+
+    panel_tokens = _tokens(PANEL_DICT.get(context.get("panel"), ""))
+    if panel_tokens and topic_tokens:
+        score += 2.0 * len(panel_tokens & topic_tokens) / len(panel_tokens)
+
+    panel_keywords = set(context.get("panel_keywords") or [])
+    if panel_keywords and topic_tokens:
+        score += 1.0 * len(panel_keywords & topic_tokens) / min(len(panel_keywords), len(topic_tokens))
+
+    return score
+
+
+def build_disambiguation_context(df: pd.DataFrame, key: str = "Name") -> dict[str, dict]:
+    """
+    Sammelt pro Name die bekannten Informationen (Institution, Land, Panel) für die Kandidatenauswahl.
+
+    Spalten werden über ihren Namen erkannt ('institution', 'country', 'Panel', 'Field').
+    'panel_keywords' enthält die häufigsten Wörter aus den Fields der anderen Mitglieder desselben Panels.
+
+    Args:
+        df (pd.DataFrame): _DataFrame mit Panel-Mitgliedern inkl. Namensspalte_
+        key (str): _Name der Namensspalte_
+    Returns:
+        dict: _Personenschlüssel (`PersonKey.of(name)`) -> Kontext-Dictionary_
+    """
+    columns = {c.casefold(): c for c in df.columns}
+    institution_col = next((c for k, c in columns.items() if "institution" in k), None)
+    country_col = next((c for k, c in columns.items() if "country" in k), None)
+    panel_col = columns.get("panel")
+    field_col = columns.get("field")
+
+    selected = {"institution": institution_col, "country": country_col, "panel": panel_col}
+    selected = {target: col for target, col in selected.items() if col}
+    df_context = df[list(selected.values())].rename(columns={col: target for target, col in selected.items()})
+    df_context["person_key"] = PersonKey.keys(df, key)
+    df_context = df_context.drop_duplicates("person_key", keep="last").set_index("person_key")
+    if "panel" in df_context:
+        df_context["panel"] = df_context["panel"].astype(str).str.strip()
+    if "country" in df_context:
+        df_context["country"] = map_country_codes(df_context["country"])
+
+    panel_keywords = {}
+    if panel_col and field_col:
+        fields = df[[panel_col, field_col]].dropna()
+        for panel, group in fields.groupby(fields[panel_col].astype(str).str.strip()):
+            words = pd.Series([t for text in group[field_col] for t in _tokens(text)])
+            panel_keywords[panel] = set(words.value_counts().head(30).index)
+
+    contexts = {}
+    for name, row in df_context.iterrows():
+        context = {k: v for k, v in row.items() if isinstance(v, str) and v.strip()}
+        context["panel_keywords"] = panel_keywords.get(context.get("panel"), set())
+        contexts[name] = context
+    return contexts
+
+
+def select_best_orcid(name: str, results_list: list[dict], context: dict | None = None,
+                      top_k: int = OPENALEX_TOP_K) -> str | None:
+    """Bewertet die Kandidaten und gibt die ORCID-ID des besten Kandidaten mit ORCID zurück."""
+    candidates = [
+        (score_openalex_candidate(candidate, context, rank, top_k), candidate)
+        for rank, candidate in enumerate(results_list[:top_k])
+        if candidate.get('orcid')
+    ]
+    if not candidates:
+        return None
+
+    best_score, best_candidate = max(candidates, key=lambda x: x[0])
+    orcid = best_candidate['orcid']
+    print(f"🎯 Bester Kandidat für '{name}': {best_candidate.get('display_name')} (Score {best_score:.2f}, {len(candidates)} mit ORCID)")
+    # ORCID ID extrahieren (URL → ID)
+    return orcid.split('/')[-1] if '/' in orcid else orcid
+
+
+def fetch_openalex_orcid_only(name: str, force_retry: bool = False, context: dict | None = None,
+                              top_k: int = OPENALEX_TOP_K, resolver_mode: str | None = None) -> str | None:
     """
     Holt nur die ORCID-ID von OpenAlex.
+
+    Je nach Resolver-Modus wird zuerst der lokale OpenAlex-Index (siehe OpenAlexAuthorIndex) befragt.
+    Online werden die Top-k Kandidaten in einer einzigen Anfrage geladen. In beiden Fällen werden die
+    Kandidaten lokal über `score_openalex_candidate` bewertet und der beste Kandidat mit ORCID gewählt.
+
+    Bekannte Fehlschläge (kein Treffer / keine ORCID) werden im NegativeCache gespeichert
+    und bis zum Ablauf der TTL ohne API-Call beantwortet.
     
     Args:
         name: Vollständiger Name des Forschers
+        force_retry: Erneute Suche auch bei gespeichertem Fehlschlag erzwingen
+        context: Bekannte Informationen (Institution, Land, Panel) zur Kandidatenauswahl
+        top_k: Anzahl der Kandidaten, die bewertet werden
+        resolver_mode: "online", "index_first" oder "offline" (Standard: RESOLVER_MODE)
         
     Returns:
         ORCID-ID als String oder None
     """
+    # "openalex": kein Treffer, "orcid": Treffer ohne ORCID (jeweils mit eigener TTL)
+    if not force_retry and (get_negative_cache().is_miss("openalex", name) or get_negative_cache().is_miss("orcid", name)):
+        print(f"⏭️ Bekannter Fehlschlag (OpenAlex) für '{name}', übersprungen")
+        return None
+
+    def found(orcid_id: str) -> str:
+        get_negative_cache().forget("openalex", name)
+        get_negative_cache().forget("orcid", name)
+        return orcid_id
+
+    resolver_mode = resolver_mode or RESOLVER_MODE
+    if resolver_mode != "online" and not get_openalex_index().is_empty():
+        orcid_id = select_best_orcid(name, get_openalex_index().search(name, limit=top_k), context, top_k)
+        if orcid_id:
+            return found(orcid_id)
+    if resolver_mode == "offline":
+        print(f"⚠️ Keine ORCID im lokalen OpenAlex-Index für '{name}'")
+        return None
+
+    import requests
     search_name = name.replace(" ", "+")
-    base_url = f"https://api.openalex.org/authors?filter=display_name.search:{search_name}"
+    base_url = f"https://api.openalex.org/authors?filter=display_name.search:{search_name}&per-page={top_k}"
     
     try:
         response = requests.get(base_url, timeout=10)
+        PageArchive.capture("openalex", base_url, response.text, status=response.status_code)
         response.raise_for_status()
         
         data = response.json()
@@ -103,17 +353,15 @@ def fetch_openalex_orcid_only(name: str) -> str | None:
         
         if not results_list:
             print(f"⚠️ Keine OpenAlex-Ergebnisse für '{name}'")
+            get_negative_cache().record_miss("openalex", name, "no_results")
             return None
         
-        first_result = results_list[0]
-        orcid = first_result.get('orcid')
-        
-        if orcid:
-            # ORCID ID extrahieren (URL → ID)
-            orcid_id = orcid.split('/')[-1] if '/' in orcid else orcid
-            return orcid_id
+        orcid_id = select_best_orcid(name, results_list, context, top_k)
+        if orcid_id:
+            return found(orcid_id)
         
         print(f"⚠️ Keine ORCID gefunden für '{name}'")
+        get_negative_cache().record_miss("orcid", name, "no_orcid")
         return None
     
     except Exception as e:
@@ -121,12 +369,14 @@ def fetch_openalex_orcid_only(name: str) -> str | None:
         return None
 
 
-def fetch_researcher_info_orcid_first(name: str) -> dict | None:
+def fetch_researcher_info_orcid_first(name: str, force_retry: bool = False, context: dict | None = None) -> dict | None:
     """
     Holt ORCID von OpenAlex und alle Daten (inkl. Affiliation) von ORCID.
     
     Args:
         name: Vollständiger Name des Forschers
+        force_retry: Gespeicherte Fehlschläge ignorieren
+        context: Bekannte Informationen zur Kandidatenauswahl (siehe `build_disambiguation_context`)
         
     Returns:
         Dictionary mit allen Forscherdaten oder None
@@ -134,7 +384,7 @@ def fetch_researcher_info_orcid_first(name: str) -> dict | None:
     print(f"🔍 Suche ORCID für: {name}")
     
     # 1. ORCID von OpenAlex holen
-    orcid_id = fetch_openalex_orcid_only(name)
+    orcid_id = fetch_openalex_orcid_only(name, force_retry=force_retry, context=context)
     
     if not orcid_id:
         print(f"❌ Keine ORCID gefunden für '{name}'")
@@ -143,6 +393,7 @@ def fetch_researcher_info_orcid_first(name: str) -> dict | None:
     print(f"✅ ORCID gefunden: {orcid_id}")
     
     # 2. Alle Daten von ORCID holen
+    from ORCIDClient import ORCIDClient
     orcid_data = ORCIDClient.get_research_info(orcid_id)
     
     if not orcid_data:
@@ -160,47 +411,300 @@ def fetch_researcher_info_orcid_first(name: str) -> dict | None:
     }
 
 
-def highlight_continuous_members(df):
+def find_researchgate_skills(name: str, researchgate_workers: int = 2, max_pages: int = 4,
+                             pages_per_browser: int = 25):
     """
-    Markiere Mitglieder die 4 mal aufeinander im Panel waren.
-    Dabei wird eine neue Spalte 'Continuous_Member' hinzugefügt, die True für kontinuierliche Mitglieder und False für andere Mitglieder enthält.
-    Hier wird nur das Jahr True markiert, in dem das Mitglied zum 4. Mal in Folge teilgenommen hat.
-    Wenn ein Mitglied z.B. 2015, 2016, 2017, 2018 teilgenommen hat, wird nur 2018 als True markiert. Wenn das Mitglied wieder 2020 teilnimmt, wird 2020 nicht markiert, da die Teilnahme nicht kontinuierlich ist.
+    Sucht die ResearchGate-Skills über den gespeicherten bzw. geratenen Profil-Slug.
+
+    Slugs kommen aus dem `ResearchGateSlugResolver` (geprüfter Slug zuerst, bekannte Fehlversuche werden
+    übersprungen). Jeder Slug wird zuerst per HTTP geladen; 404-Seiten und Profile anderer Personen werden
+    als falsch gemerkt und der nächste Slug probiert. Sind alle Varianten falsch, wird einmal die
+    ResearchGate-Suche befragt. Selenium wird nur bei Challenge-Seite oder fehlendem Skills-Bereich gestartet.
 
     Args:
-        df (pd.DataFrame): _DataFrame mit Panel-Mitgliedern und deren Teilnahmejahren_
+        name: Vollständiger Name des Forschers
+        researchgate_workers: Größe des gemeinsamen Browser-Pools
+        max_pages: Maximale Anzahl an Seitenaufrufen für verschiedene Slugs
+        pages_per_browser: Seiten, nach denen ein Browser im Pool neu gestartet wird
+
     Returns:
-        pd.DataFrame: _DataFrame mit zusätzlicher Spalte 'Continuous_Member'_
+        (Skill-Liste oder None, zuletzt genutzte Quelle oder None, wenn keine Variante passt)
     """
+    from ResearchGateHttp import ResearchGateHttp
 
-    # # add beispiel daten
-    # print(df.shape)
-    # df = pd.concat([df, pd.DataFrame(
-    #     {
-    #     "First name": ["Alice", "Alice", "Alice", "Alice", "Alice"],
-    #     "Last name": ["Adam", "Adam", "Adam", "Adam", "Adam"],
-    #     "Call": ["Panel 2015", "Panel 2016", "Panel 2017", "Panel 2018", "Panel 2019"],
-    #     })
-    #     ], 
-    # ignore_index=True,)
-    # print(df.shape)
+    slug_resolver = get_slug_resolver()
+    searched = False
+    for _ in range(max_pages):
+        candidates = slug_resolver.candidates(name)
+        if not candidates and not searched:
+            slug_resolver.add_search_results(name, ResearchGateHttp.search_profiles(name))
+            searched = True
+            candidates = slug_resolver.candidates(name)
+        if not candidates:
+            break
 
-    
-    
+        slug = candidates[0]
+        rg_source = ResearchGateHttp(name, slug=slug)
+        skills = rg_source.find_skills()
+        if rg_source.not_found or rg_source.wrong_person:
+            slug_resolver.record_bad(name, slug, "wrong_person" if rg_source.wrong_person else "not_found")
+            continue
+
+        source = "http"
+        if rg_source.needs_browser:
+            # Selenium wird erst hier geladen, da der Fallback nur selten gebraucht wird
+            from ResearchGateSelenium import ResearchGateSelenium
+            from WebDriverPool import WebDriverPool
+            driver_pool = WebDriverPool.shared(size=researchgate_workers, max_pages=pages_per_browser)
+            rg_source = ResearchGateSelenium(name=name, headless=True, slug=slug, driver_pool=driver_pool)
+            skills = rg_source.find_skills()
+            outcome = "ok" if skills else "denied" if rg_source.access_denied else "error" if rg_source.temporary_failure else "missing"
+            ResearchGateHttp.record("selenium", outcome)
+            source = "selenium"
+        if skills:
+            slug_resolver.record_verified(name, slug, source)
+        return skills, rg_source
+
+    print(f"⏭️ Kein passendes ResearchGate-Profil für '{name}'")
+    return None, None
+
+
+def generate_researcher_profile(name: str, force_retry: bool = False, context: dict | None = None,
+                                researchgate_workers: int = 2, pages_per_browser: int = 25) -> dict:
+    """
+    Erstellt Profil (Field) und Affiliation für einen Forscher.
+
+    Zuerst werden ORCID-Keywords genutzt, fehlen diese, wird ResearchGate als Fallback abgefragt
+    (erst per HTTP, nur bei Bedarf mit Selenium).
+    Namen, die bei einem Provider bekanntermaßen nichts liefern, werden dort übersprungen.
+
+    Args:
+        name: Vollständiger Name des Forschers
+        force_retry: Gespeicherte Fehlschläge ignorieren und erneut suchen
+        context: Bekannte Informationen zur Kandidatenauswahl (siehe `build_disambiguation_context`)
+        researchgate_workers: Größe des gemeinsamen Browser-Pools (parallele ResearchGate-Abfragen)
+        pages_per_browser: Seiten, nach denen ein Browser im Pool neu gestartet wird
+
+    Returns:
+        Dictionary mit 'profile', 'affiliation' und 'status'
+        ('complete', 'profile_only', 'affiliation_only' oder 'not_found'; 'temporary_failure' als Fallback,
+        wenn ResearchGate nach allen Versuchen gesperrt blieb)
+
+    Raises:
+        RetryLater: ResearchGate hat die Anfrage gesperrt; der JobRunner versucht den Namen später erneut
+    """
+    results = fetch_researcher_info_orcid_first(name, force_retry=force_retry, context=context)
+    if not results:
+        return {"profile": None, "affiliation": None, "status": "not_found"}
+
+    pprint(results)
+    affiliation = results.get("affiliation", None)
+    # replace list commas with semicolons and make text lowercase
+    profile_text = "; ".join(results.get("topics", [])).lower()
+
+    if not profile_text and (force_retry or not get_negative_cache().is_miss("researchgate", name)):
+        skills, rg_source = find_researchgate_skills(name, researchgate_workers=researchgate_workers,
+                                                     pages_per_browser=pages_per_browser)
+        profile_text = "; ".join(skills).lower() if skills else None
+        if getattr(rg_source, "should_retry", False):
+            # Gesperrt oder Seite nicht geladen: später erneut versuchen, beim letzten Versuch das Profil ohne Skills übernehmen.
+            # Der Status bleibt vorübergehend, damit ein fortgesetzter Lauf den Namen erneut sucht
+            fallback = {"profile": None, "affiliation": affiliation, "status": "temporary_failure"}
+            reason = "ResearchGate Access Denied" if rg_source.access_denied else "ResearchGate-Seite nicht geladen"
+            raise RetryLater(reason, delay=rg_source.retry_delay(), fallback=fallback)
+        if skills:
+            get_negative_cache().forget("researchgate", name)
+        elif rg_source is None or rg_source.skills_missing:
+            # Nur echte Misses cachen (Seite geladen, aber keine Skills), keine Browser-Fehler
+            get_negative_cache().record_miss("researchgate", name, "no_skills")
+
+    if profile_text and affiliation:
+        status = "complete"
+    elif profile_text:
+        status = "profile_only"
+    elif affiliation:
+        status = "affiliation_only"
+    else:
+        status = "not_found"
+    return {"profile": profile_text or None, "affiliation": affiliation, "status": status}
+
+
+def highlight_continuous_members(df, threshold: int = 4, streak_length: bool = False, streak_start: bool = False,
+                                 history=None, grantees: bool = False):
+    """
+    Markiere Mitglieder die `threshold` mal (Standard: 4) aufeinander im Panel waren.
+    Dabei wird eine neue Spalte '4x Continuous Member' (bzw. '<threshold>x Continuous Member') hinzugefügt, die True für kontinuierliche Mitglieder und False für andere Mitglieder enthält.
+    Hier wird nur das Jahr True markiert, in dem das Mitglied zum 4. Mal (oder öfter) in Folge teilgenommen hat.
+    Wenn ein Mitglied z.B. 2015, 2016, 2017, 2018 teilgenommen hat, wird nur 2018 als True markiert. Wenn das Mitglied wieder 2020 teilnimmt, wird 2020 nicht markiert, da die Teilnahme nicht kontinuierlich ist.
+
+    Die Serien werden vektorisiert bestimmt: Eine neue Serie beginnt, wenn der Name wechselt oder das Jahr nicht
+    direkt auf das vorherige folgt; die Serienlänge ergibt sich aus einer kumulativen Zählung pro Serie.
+    Mit `history` (ein `PanelHistoryIndex`) werden die Serien aus dem Index gelesen, also über alle eingelesenen
+    Arbeitsmappen und panel-members-excel.xls hinweg (pro Programm des Calls). Zeilen ohne Indexeintrag
+    (z. B. aus Tabellenblättern, die der Index nicht einliest) behalten die Serie aus dem Tabellenblatt.
+
+    Args:
+        df (pd.DataFrame): _DataFrame mit Panel-Mitgliedern und deren Teilnahmejahren_
+        threshold (int): _Anzahl aufeinanderfolgender Jahre, ab der markiert wird_
+        streak_length (bool): _Zusätzliche Spalte 'Streak Length' (Länge der Serie bis zu diesem Jahr)_
+        streak_start (bool): _Zusätzliche Spalte 'Streak Start' (erstes Jahr der Serie)_
+        history (PanelHistoryIndex): _Optionaler Index, aus dem die Serien gelesen werden_
+        grantees (bool): _Mit `history`: Grantee-Jahre statt Panel-Jahre zählen_
+    Returns:
+        pd.DataFrame: _DataFrame (sortiert nach Name und Jahr) mit zusätzlicher Spalte '4x Continuous Member'_
+    """
     df.columns = df.columns.str.strip().str.replace(r'\s+', ' ', regex=True) # Spaltennamen bereinigen
-    df["Name"] = df["First name"] + " " + df["Last name"]
+    # Gruppiert wird über den kanonischen Personenschlüssel (Schreibvarianten zählen als dieselbe Person)
+    if PersonKey.COLUMN in df.columns:
+        df["_person"] = df[PersonKey.COLUMN]
+    else:
+        df["_person"] = PersonKey.column(PersonKey.full_name(df["First name"], df["Last name"]))
     df["Year"] = df["Call"].str.extract(r'(\d{4})').astype(int)
-    df = df.sort_values(by=["Name", "Year"])
-    df["4x Continuous Member"] = False
-    for name, group in df.groupby("Name"):
-        years = group["Year"].values
-        count = 1
-        for i in range(1, len(years)): # Starte bei 1, da wir das vorherige Jahr vergleichen
-            if years[i] == years[i-1] + 1: # Überprüfe ob das Jahr auf das vorherige Jahr folgt
-                count += 1 # Erhöhe den Zähler für aufeinanderfolgende Jahre
-                if count >= 4: # Wenn der Zähler 4 erreicht, markiere das Jahr als kontinuierlich
-                    df.loc[(df["Name"] == name) & (df["Year"] == years[i]), "4x Continuous Member"] = True
-            else:
-                count = 1
-    df.drop(columns=["Name", "Year"], inplace=True)
-    return df
\ No newline at end of file
+    df = df.sort_values(by=["_person", "Year"], kind="stable")
+
+    # Jede Person und jedes Jahr nur einmal zählen: Schreibvarianten derselben Person im selben Jahr
+    # würden sonst als doppeltes Jahr die Serie unterbrechen
+    keys = ["_person", "Year"]
+    streaks = df[keys].drop_duplicates()
+    name, year = streaks["_person"], streaks["Year"]
+    # Neue Serie bei neuem Namen oder Lücke
+    new_streak = (name != name.shift()) | (year != year.shift() + 1)
+    streak_id = new_streak.cumsum()
+    streaks["length"] = streak_id.groupby(streak_id).cumcount() + 1
+    streaks["start"] = year.groupby(streak_id).transform("first")
+    per_row = df[keys].merge(streaks, on=keys, how="left").set_index(df.index)
+
+    if history is not None:
+        # Serienlänge bis zum Jahr der Zeile aus dem programmübergreifenden Index
+        df["_programme"] = df["Call"].map(lambda call: history.parse_call(call)[0])
+        index_keys = keys + ["_programme"]
+        indexed = df[index_keys].drop_duplicates()
+        indexed["length"] = [
+            history.streak_length(person, year, programme=programme, grantees=grantees)
+            for person, year, programme in zip(indexed["_person"].astype(str), indexed["Year"], indexed["_programme"])
+        ]
+        indexed["start"] = indexed["Year"] - indexed["length"] + 1
+        from_index = df[index_keys].merge(indexed, on=index_keys, how="left").set_index(df.index)
+        # Ohne Indexeintrag für die Zeile (z. B. Tabellenblatt, das nicht eingelesen wird) gilt die Serie aus dem Blatt
+        use_index = from_index["length"] > 0
+        per_row = per_row.where(~use_index, from_index[["length", "start"]])
+
+    # Wie bisher: alle Zeilen einer Person im markierten Jahr erhalten True
+    reached = per_row["length"] >= threshold
+    df[f"{threshold}x Continuous Member"] = reached.groupby([df["_person"], df["Year"]], observed=True).transform("any")
+    if streak_length:
+        df["Streak Length"] = per_row["length"]
+    if streak_start:
+        df["Streak Start"] = per_row["start"]
+
+    df.drop(columns=[c for c in ("_person", "_programme", "Year") if c in df.columns], inplace=True)
+    return df
+
+
+def apply_enrichment_results(df: pd.DataFrame, results: pd.DataFrame, key: str = "Name") -> pd.DataFrame:
+    """
+    Schreibt gesammelte Profilergebnisse in einem Schritt in den DataFrame zurück.
+
+    Die Ergebnisse werden über den Personenschlüssel der Namensspalte (z. B. 'Name') gemappt.
+    Es werden nur leere Zellen (NaN oder leerer String) befüllt, vorhandene Werte bleiben erhalten.
+
+    Args:
+        df (pd.DataFrame): _DataFrame mit Panel-Mitgliedern_
+        results (pd.DataFrame): _Ergebnisse mit Index = Schlüssel und Spalten = Zielspalten in df_
+        key (str): _Name der Schlüsselspalte in df_
+    Returns:
+        pd.DataFrame: _DataFrame mit befüllten Zellen_
+    """
+    if results.empty:
+        return df
+
+    # Doppelte Schlüssel würden das Mapping mehrdeutig machen
+    results = results.set_axis(results.index.map(PersonKey.of))
+    results = results[~results.index.duplicated(keep="last")]
+    person_keys = PersonKey.keys(df, key)
+
+    for column in results.columns:
+        if column not in df.columns:
+            continue
+        values = df[column]
+        mapped = person_keys.map(results[column])
+        is_empty = values.isna() | values.astype(str).str.strip().eq("")
+        df[column] = values.where(~(is_empty & mapped.notna()), mapped)
+    return df
+
+
+def _project_keys(df: pd.DataFrame, acronym: str, call: str, name: str) -> tuple[pd.Series, pd.Series]:
+    """Primärschlüssel (Akronym + Call) und Sekundärschlüssel (Name + Call) pro Zeile, None wenn nicht bildbar."""
+    empty = pd.Series("", index=df.index)
+    acronym_key = PersonKey.column(df[acronym], plain=True).astype(str) if acronym in df.columns else empty
+    call_key = PersonKey.column(df[call], plain=True).astype(str) if call in df.columns else empty
+    name_key = PersonKey.keys(df, name) if name in df.columns or PersonKey.COLUMN in df.columns else empty
+    primary = (acronym_key + "|" + call_key).where(acronym_key.ne("") & call_key.ne(""))
+    secondary = (name_key + "|" + call_key).where(name_key.ne(""))
+    return primary, secondary
+
+
+def _lookup(keys: pd.Series) -> pd.Series:
+    """Schlüssel -> erste Zeilenposition (ohne fehlende Schlüssel)."""
+    positions = pd.Series(range(len(keys)), index=keys.values)
+    positions = positions[positions.index.notna()]
+    return positions[~positions.index.duplicated(keep="first")]
+
+
+def merge_grantee_projects(df_grantees: pd.DataFrame, df_dashboard: pd.DataFrame, acronym: str, call: str,
+                           name: str = "Name", dashboard_wins: list[str] | tuple = ()) -> pd.DataFrame:
+    """
+    Führt Dashboard-Projekte per Upsert in die Grantees-Tabelle ein (statt `concat` + `drop_duplicates` über alle Spalten).
+
+    Zeilen werden über Akronym + Call zugeordnet; fehlt einer der beiden Werte, über den normalisierten Namen + Call.
+    Passende Dashboard-Zeilen aktualisieren die vorhandene Grantee-Zeile, alle anderen werden angehängt.
+    Pro Spalte gilt: Grantee-Werte bleiben erhalten und leere Zellen werden aus dem Dashboard befüllt; bei Spalten in
+    `dashboard_wins` überschreibt ein nicht leerer Dashboard-Wert den Grantee-Wert.
+    Verglichen werden nur die Schlüssel, lange Texte (z. B. Abstracts) werden nicht gehasht.
+
+    Args:
+        df_grantees (pd.DataFrame): _Tabellenblatt 'Grantees'_
+        df_dashboard (pd.DataFrame): _Dashboard-Export mit den Spaltennamen der Grantees-Tabelle_
+        acronym (str): _Spalte mit dem Projekt-Akronym_
+        call (str): _Spalte mit dem Call (z. B. 'ERC-2023-StG')_
+        name (str): _Spalte mit dem vollständigen Namen_
+        dashboard_wins (list[str]): _Spalten, in denen das Dashboard Vorrang hat_
+    Returns:
+        pd.DataFrame: _Grantees mit aktualisierten und neuen Projekten, ohne doppelte Schlüssel_
+    """
+    base = df_grantees.reset_index(drop=True)
+    updates = df_dashboard.reset_index(drop=True)
+
+    # Doppelte Schlüssel innerhalb der Grantees entfernen (erste Zeile bleibt)
+    base_primary, base_secondary = _project_keys(base, acronym, call, name)
+    base_key = base_primary.fillna(base_secondary)
+    keep = base_key.isna() | ~base_key.duplicated(keep="first")
+    base, base_primary, base_secondary = base[keep].reset_index(drop=True), base_primary[keep], base_secondary[keep]
+
+    # Dashboard-Zeilen zuordnen: zuerst Akronym + Call, dann Name + Call
+    update_primary, update_secondary = _project_keys(updates, acronym, call, name)
+    target = update_primary.map(_lookup(base_primary))
+    target = target.fillna(update_secondary.map(_lookup(base_secondary)))
+
+    def is_empty(values: pd.Series) -> pd.Series:
+        return values.isna() | values.astype(str).str.strip().eq("")
+
+    matched = updates[target.notna()].set_index(target[target.notna()].astype(int))
+    matched = matched[~matched.index.duplicated(keep="first")]
+    for column in matched.columns:
+        new = matched[column]
+        if column not in base.columns:
+            base[column] = pd.Series(None, index=base.index, dtype=object)
+        current = base.loc[new.index, column]
+        if column in dashboard_wins:
+            merged = current.where(is_empty(new), new)
+        else:
+            merged = current.where(~is_empty(current), new)
+        base[column] = base[column].astype(object)
+        base.loc[new.index, column] = merged
+
+    # Nicht zugeordnete Dashboard-Zeilen anhängen (doppelte Schlüssel nur einmal)
+    new_rows = updates[target.isna()]
+    new_key = update_primary[target.isna()].fillna(update_secondary[target.isna()])
+    new_rows = new_rows[new_key.isna() | ~new_key.duplicated(keep="first")]
+    return pd.concat([base, new_rows], ignore_index=True, sort=False)
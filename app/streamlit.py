@@ -1,14 +1,18 @@
+import io
 import streamlit as st
 import pandas as pd
-import time
-import random
-from pprint import pprint
 
 # eigene Module
-from ResearchGateSelenium import ResearchGateSelenium
-from helper_functions import (get_country_code, 
-                              fetch_researcher_info_orcid_first,
-                              highlight_continuous_members)
+from EnrichmentJournal import EnrichmentJournal
+from JobRunner import JobRunner
+from PanelHistoryIndex import PanelHistoryIndex
+from PersonKey import PersonKey
+from helper_functions import (map_country_codes, 
+                              generate_researcher_profile,
+                              build_disambiguation_context,
+                              highlight_continuous_members,
+                              apply_enrichment_results,
+                              merge_grantee_projects)
 
 
 # -----------------------------
@@ -16,6 +20,39 @@ from helper_functions import (get_country_code,
 # -----------------------------
 st.set_page_config(page_title="Researcher Excel Explorer", layout="wide")
 
+
+@st.cache_resource
+def get_job_runner() -> JobRunner:
+    """Ein gemeinsamer Job-Runner pro Prozess, geteilt von allen Sessions."""
+    return JobRunner(max_workers=4)
+
+
+@st.cache_data(show_spinner=False)
+def load_sheet_names(file_bytes: bytes) -> list:
+    """Tabellenblätter einer hochgeladenen Excel-Datei (einmal pro Datei statt bei jedem Rerun)."""
+    return pd.ExcelFile(io.BytesIO(file_bytes)).sheet_names
+
+
+@st.cache_data(show_spinner=False)
+def load_sheet(file_bytes: bytes, sheet_name) -> pd.DataFrame:
+    """Ein Tabellenblatt einer hochgeladenen Excel-Datei (gecacht, jeder Aufruf erhält eine Kopie)."""
+    return pd.read_excel(io.BytesIO(file_bytes), sheet_name=sheet_name)
+
+
+@st.cache_resource
+def get_panel_history() -> PanelHistoryIndex:
+    """Gemeinsamer Index der Panel-Teilnahmen über alle Programme (persistiert in SQLite)."""
+    return PanelHistoryIndex()
+
+
+@st.cache_data(show_spinner=False)
+def ingest_panel_history(file_bytes: bytes, file_name: str) -> int:
+    """Übernimmt eine hochgeladene Arbeitsmappe einmal in den Historien-Index."""
+    return get_panel_history().ingest_workbook(io.BytesIO(file_bytes), name=file_name)
+
+
+job_runner = get_job_runner()
+
 tab1, tab2, tab3 = st.tabs(["Step 1: File Upload", "Step 2: ERC Profilgenerator", "Step 3: Grantees und Panel Members zusammenführen"])
 with tab1:
     st.info("ℹ️ Lade die erforderlichen Excel-Dateien hoch.")
@@ -59,15 +96,27 @@ with tab2:
     if grantees_and_panel_member_excel is not None:
         # Datei als DataFrame laden
         try:
-            sheet_names = pd.ExcelFile(grantees_and_panel_member_excel).sheet_names
+            sheet_names = load_sheet_names(grantees_and_panel_member_excel.getvalue())
             col1, col2 = st.columns(2)
             
             
             with col1:
                 sheet_name = st.selectbox("Wähle ein Tabellenblatt:", sheet_names)
-            df_gapm = pd.read_excel(grantees_and_panel_member_excel, sheet_name=sheet_name)
+            df_gapm = load_sheet(grantees_and_panel_member_excel.getvalue(), sheet_name)
             df_gapm.columns = df_gapm.columns.str.strip().str.replace(r'\s+', ' ', regex=True) # Spaltennamen bereinigen
-            df_gapm = highlight_continuous_members(df_gapm)
+
+            # Name-Spalte und Personenschlüssel einmal beim Laden erstellen
+            if "First name" in df_gapm.columns and "Last name" in df_gapm.columns:
+                df_gapm["Name"] = PersonKey.full_name(df_gapm["First name"], df_gapm["Last name"])
+                df_gapm = PersonKey.add_column(df_gapm)
+                #st.info("✅ Spalte 'Name' erstellt.")
+            else:
+                st.warning("⚠️ Spalten 'First name' und/oder 'Last name' fehlen!")
+
+            # Serien aus dem programmübergreifenden Index (alle hochgeladenen Arbeitsmappen) statt nur aus diesem Blatt
+            ingest_panel_history(grantees_and_panel_member_excel.getvalue(), grantees_and_panel_member_excel.name)
+            df_gapm = highlight_continuous_members(df_gapm, history=get_panel_history(),
+                                                   grantees="grantee" in str(sheet_name).casefold())
 
             #st.subheader("🧾 Vorschau der Daten:")
             #st.dataframe(df_gapm.head())
@@ -83,14 +132,12 @@ with tab2:
                     df_gapm = df_gapm[df_gapm["Call"] == filter_call]
                     st.success(f"Gefiltert nach: {filter_call}")
 
-            # Name-Spalte erstellen
-            if "First name" in df_gapm.columns and "Last name" in df_gapm.columns:
-                df_gapm["Name"] = df_gapm["First name"].astype(str) + " " + df_gapm["Last name"].astype(str)
-                #st.info("✅ Spalte 'Name' erstellt.")
-            else:
-                st.warning("⚠️ Spalten 'First name' und/oder 'Last name' fehlen!")
+            st.dataframe(df_gapm.drop(columns=[PersonKey.COLUMN], errors="ignore"))
 
-            st.dataframe(df_gapm)
+            # Programmübergreifende Historie aus demselben Index
+            if "Name" in df_gapm.columns:
+                with st.expander("📚 Panel-Historie über alle Programme"):
+                    st.dataframe(get_panel_history().summary(df_gapm["Name"]))
             st.divider()
 
 
@@ -108,7 +155,7 @@ with tab2:
                 missing_rows = df_gapm[mask]
 
                 st.write(f"Anzahl der Zeilen mit fehlenden Werten: {missing_rows.shape[0]}")
-                st.dataframe(missing_rows.drop(columns=['Name']))
+                st.dataframe(missing_rows.drop(columns=['Name', PersonKey.COLUMN], errors="ignore"))
             else:
                 st.info("Bitte wähle mindestens eine Spalte aus.")
                 
@@ -125,103 +172,129 @@ with tab2:
                 affiliation_column = st.selectbox("Wähle die Spalte für die Affiliation:", options=selected_columns, index=0)
             names_to_search = selected_member if selected_member else st.text_input("Name eingeben, um Profil zu erstellen:")
 
-            num_generated_profiles = 0
-            num_generated_affiliations = 0
-            num_not_found = 0
-            num_green = 0
+            # Run-Journal: abgeschlossene Suchen werden persistiert und können fortgesetzt werden
+            journal = EnrichmentJournal()
+            workbook_hash = EnrichmentJournal.workbook_hash(grantees_and_panel_member_excel.getvalue())
+            run_id = EnrichmentJournal.make_run_id(workbook_hash, sheet_name, filter_call if "Call" in df_gapm.columns else None)
+            finished_lookups = journal.completed(run_id)
+            col1, col2 = st.columns(2)
+            with col1:
+                resume_run = st.checkbox(f"Unterbrochenen Lauf fortsetzen ({len(finished_lookups)} bereits verarbeitet)", value=True)
+            with col2:
+                if st.button("Journal für diesen Lauf löschen"):
+                    journal.clear(run_id)
+                    finished_lookups = {}
+            force_retry = st.checkbox(
+                "Bekannte Fehlschläge erneut suchen (OpenAlex/ResearchGate-Misses ignorieren)", value=False
+            )
+            col1, col2 = st.columns(2)
+            with col1:
+                parallel_workers = st.slider("Parallele Suchen (Browser für ResearchGate)", min_value=1, max_value=6, value=2)
+            with col2:
+                pages_per_browser = st.slider("Seiten pro Browser bis zum Neustart", min_value=5, max_value=100, value=25, step=5)
+
             if st.button("Profil generieren"):
                 if not names_to_search:
                     st.warning("Bitte mindestens einen Namen eingeben.")
                 else:
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()  # Platzhalter für Statusnachricht
-                    total_names = len(names_to_search)
-
-                    for idx, name_to_search in enumerate(names_to_search):
-                        current_progress = (idx + 1) / total_names
-                        status_text.text(f"🔍 Verarbeite {idx + 1}/{total_names}: {name_to_search}")
-
-                        if name_to_search.strip():
-                            with st.spinner(f"Suche nach {name_to_search}..."):
-                                results = fetch_researcher_info_orcid_first(name_to_search)
-
-                                if results:
-                                    #st.json(results)
-                                    affiliation = results.get("affiliation", None)
-
-                                    #st.write("**Generiere Profil mit Ollama...**")
-                                    pprint(results)
-                                    #profile_text = process_researcher_profile(results)
-                                    profile_text = results.get("topics", [])
-                                    # replace list commas with semicolons and make text lowercase
-                                    profile_text = "; ".join(profile_text).lower()
-
-                                    if not profile_text:
-                                        rg_selenium = ResearchGateSelenium(name=name_to_search, headless=True)
-                                        profile_text = rg_selenium.find_skills() 
-                                        profile_text = "; ".join(profile_text).lower() if profile_text else None
-                                    
-
-
-                                    if profile_text and affiliation:
-                                        st.success(f"✅ Profil für {name_to_search} generiert")
-                                        num_generated_profiles += 1
-                                        num_generated_affiliations += 1
-                                        num_green += 1
-                                    elif profile_text and not affiliation:
-                                        num_generated_profiles += 1
-                                        st.warning(f"⚠️ Profil generiert, aber keine Affiliation für {name_to_search} gefunden.")
-                                    
-                                    elif not profile_text and affiliation:
-                                        num_generated_affiliations += 1
-                                        st.warning(f"⚠️ Affiliation gefunden, aber kein Profil für {name_to_search}.")
-                                        
-                                    else:
-                                        num_not_found += 1
-                                        st.error(f"⚠️ Weder Profil noch Affiliation für {name_to_search} gefunden.")
-                                        #st.write(profile_text)
-
-                                    df_gapm_member = missing_rows[missing_rows['Name'] == name_to_search]
-                                    df_gapm_member.loc[:, profile_column] = profile_text
-                                    df_gapm_member.loc[:, affiliation_column] = affiliation
-
-                                    # Ursprünglichen DataFrame aktualisieren
-                                    for row_idx in df_gapm_member.index:
-                                        df_gapm.at[row_idx, profile_column] = df_gapm_member.at[row_idx, profile_column]
-                                        df_gapm.at[row_idx, affiliation_column] = df_gapm_member.at[row_idx, affiliation_column]
-                                
-                                else:
-                                    st.error(f"⚠️ Keine Daten für {name_to_search} gefunden.")
-                                    num_not_found += 1
-                            random_time = random.uniform(0.5, 1.5)
-                            time.sleep(random_time)
-
-                        else:
-                            st.warning("Leerer Name übersprungen.")
-
-                        # Fortschritt aktualisieren
-                        progress_bar.progress(current_progress)
-
-                    # Alles fertig 🎉
-                    progress_bar.empty()
-                    status_text.text("✅ Alle Profile wurden verarbeitet!")
-
-                    df_generated_profiles_affiliations = pd.DataFrame({
-                        "Vollstädnige Profile" : [num_green],
-                        "Generierte Profile": [num_generated_profiles],
-                        "Generierte Affiliations": [num_generated_affiliations],
-                        "Nicht gefunden": [num_not_found]
-                    })
-                    st.dataframe(df_generated_profiles_affiliations)
+                    if isinstance(names_to_search, str):
+                        names_to_search = [names_to_search]
+                    # Jobs, Journal und Caches arbeiten mit dem Personenschlüssel, der Anzeigename wird mitgeführt
+                    display_names = {}
+                    for name in names_to_search:
+                        if PersonKey.of(name):
+                            display_names.setdefault(PersonKey.of(name), name.strip())
+                    st.session_state["enrichment_names"] = display_names
+                    resumed = {}
+                    if resume_run and finished_lookups:
+                        # Bereits abgeschlossene Namen überspringen, Ergebnisse aus dem Journal übernehmen
+                        resumed = {
+                            key: finished_lookups[key] for key in display_names
+                            if key in finished_lookups
+                            and not EnrichmentJournal.needs_retry(finished_lookups[key], force_retry)
+                        }
+                        st.info(f"♻️ {len(resumed)} Namen aus dem Journal übernommen, {len(display_names) - len(resumed)} verbleibend.")
+
+                    # Bekannte Infos (Institution, Land, Panel) für die Auswahl des richtigen OpenAlex-Kandidaten
+                    contexts = build_disambiguation_context(df_gapm)
+
+                    # Die Suche läuft im Hintergrund weiter, auch wenn Widgets geändert werden
+                    st.session_state["enrichment_job_id"] = job_runner.submit(
+                        "Profilgenerierung",
+                        lambda key: generate_researcher_profile(
+                            display_names[key], force_retry=force_retry, context=contexts.get(key),
+                            researchgate_workers=parallel_workers, pages_per_browser=pages_per_browser,
+                        ),
+                        list(display_names),
+                        on_result=lambda key, result: journal.record(run_id, workbook_hash, display_names[key], result),
+                        initial_results=resumed,
+                        delay=(0.5, 1.5),
+                        workers=parallel_workers,
+                    )
 
-                    
+            @st.fragment(run_every=2)
+            def show_enrichment_progress(job_id):
+                job = job_runner.get(job_id)
+                if job is None:
+                    return
+                if job.done:
+                    st.rerun()  # Kompletter Rerun, damit die Ergebnisse zurückgeschrieben werden
+                display_names = st.session_state.get("enrichment_names", {})
+                current = f" – aktuell: {display_names.get(job.current_item, job.current_item)}" if job.current_item else ""
+                retries = f" – {job.retry_pending} warten auf erneuten Versuch" if job.retry_pending else ""
+                st.progress(job.progress, text=f"🔍 {job.processed}/{len(job.items)} verarbeitet{current}{retries}")
+                partial_results = job.snapshot()
+                if partial_results:
+                    df_partial = pd.DataFrame.from_dict(partial_results, orient="index")
+                    df_partial.insert(0, "Name", df_partial.index.map(lambda key: display_names.get(key, key)))
+                    st.dataframe(df_partial)
+
+            enrichment_job = job_runner.get(st.session_state.get("enrichment_job_id", ""))
+            if enrichment_job is not None and not enrichment_job.done:
+                show_enrichment_progress(enrichment_job.job_id)
+                if st.button("Profilgenerierung abbrechen"):
+                    job_runner.cancel(enrichment_job.job_id)
+                    st.warning("⏹️ Abbruch angefordert, der aktuelle Name wird noch zu Ende verarbeitet.")
+
+            elif enrichment_job is not None:
+                if enrichment_job.status == "cancelled":
+                    st.warning("⏹️ Profilgenerierung wurde abgebrochen, bisherige Ergebnisse werden übernommen.")
+                display_names = st.session_state.get("enrichment_names", {})
+                for key, error in enrichment_job.errors.items():
+                    st.error(f"⚠️ Fehler bei {display_names.get(key, key)}: {error}")
+
+                # Ergebnisse in einem Schritt in den DataFrame zurückschreiben (nur leere Zellen)
+                df_results = pd.DataFrame.from_dict(enrichment_job.snapshot(), orient="index", columns=["profile", "affiliation"])
+                if not df_results.empty:
+                    df_gapm = apply_enrichment_results(df_gapm, df_results.rename(
+                        columns={"profile": profile_column, "affiliation": affiliation_column}
+                    ))
+
+                # Alles fertig 🎉
+                st.text("✅ Alle Profile wurden verarbeitet!")
+                from ResearchGateHttp import ResearchGateHttp
+                researchgate_stats = ResearchGateHttp.stats()
+                if researchgate_stats:
+                    st.caption("ResearchGate-Abrufe (Weg_Ergebnis): " + ", ".join(f"{k}: {v}" for k, v in sorted(researchgate_stats.items())))
+
+                has_profile = df_results["profile"].notna()
+                has_affiliation = df_results["affiliation"].notna()
+                df_generated_profiles_affiliations = pd.DataFrame({
+                    "Vollstädnige Profile" : [int((has_profile & has_affiliation).sum())],
+                    "Generierte Profile": [int(has_profile.sum())],
+                    "Generierte Affiliations": [int(has_affiliation.sum())],
+                    "Nicht gefunden": [int((~has_profile & ~has_affiliation).sum() + len(enrichment_job.errors))]
+                })
+                st.dataframe(df_generated_profiles_affiliations)
+
+                
 
-                    st.subheader("📊 Aktualisierte Daten:")
-                    # drop column 'Name' before displaying
-                    df_gapm = df_gapm.drop(columns=['Name'])
-                    st.dataframe(df_gapm)
+                st.subheader("📊 Aktualisierte Daten:")
+                # drop column 'Name' before displaying
+                df_gapm = df_gapm.drop(columns=['Name', PersonKey.COLUMN], errors="ignore")
+                st.dataframe(df_gapm)
 
-                    st.success("✅ Alle fehlenden Profile wurden aktualisiert. \n Du kannst die aktualisierte Datei im nächsten Tab herunterladen.")
+                st.success("✅ Alle fehlenden Profile wurden aktualisiert. \n Du kannst die aktualisierte Datei im nächsten Tab herunterladen.")
 
 
             # st.divider()
@@ -249,9 +322,9 @@ with tab3:
     if list_of_funded_projects_excel and grantees_and_panel_member_excel is not None:
         # Datei als DataFrame laden
         # try:
-            sheet_names_lofpe = pd.ExcelFile(list_of_funded_projects_excel).sheet_names
+            sheet_names_lofpe = load_sheet_names(list_of_funded_projects_excel.getvalue())
             sheet_name_lofpe = sheet_names_lofpe[0]
-            df_dashboard = pd.read_excel(list_of_funded_projects_excel, sheet_name=sheet_name_lofpe)
+            df_dashboard = load_sheet(list_of_funded_projects_excel.getvalue(), sheet_name_lofpe)
             df_dashboard.columns = df_dashboard.columns.str.strip().str.replace(r'\s+', ' ', regex=True)
             cols = df_dashboard.columns.tolist()
             def get_safe_index(columns, desired_index):
@@ -290,11 +363,11 @@ with tab3:
             
 
             st.subheader("Tabllenblatt 'Grantees' verarbeiten")
-            sheet_names_gapme = pd.ExcelFile(grantees_and_panel_member_excel).sheet_names
+            sheet_names_gapme = load_sheet_names(grantees_and_panel_member_excel.getvalue())
             col1, col2 = st.columns(2)
             with col1:
                 sheet_name_gapme = st.selectbox("Wähle das Tabellenblatt 'Grantees':", sheet_names_gapme, key="sheet_name_gapme", index=1)
-            df_pm = pd.read_excel(grantees_and_panel_member_excel, sheet_name=sheet_name_gapme)
+            df_pm = load_sheet(grantees_and_panel_member_excel.getvalue(), sheet_name_gapme)
             df_pm.columns = df_pm.columns.str.strip().str.replace(r'\s+', ' ', regex=True)
             cols = df_pm.columns.tolist()
             # Benötigte Spalten auswählen Host Institution(s), Country, Abstract, Project Title, Researcher, Acronym, Call, CORDIS Link, Panel, Domain
@@ -328,23 +401,32 @@ with tab3:
             with col12:
                 pm_column_cordis_link = st.selectbox("Wähle die Spalte für 'CORDIS Link':", df_pm.columns.tolist(), index=get_safe_index(cols, 10), key="df_pm_cordis_link")
 
-            df_pm_name = df_pm[pm_column_first_name].astype(str) + " " + df_pm[pm_column_last_name].astype(str)
-            df_pm["Name"] = df_pm_name.str.strip()
+            df_pm["Name"] = PersonKey.full_name(df_pm[pm_column_first_name], df_pm[pm_column_last_name])
+            df_pm = PersonKey.add_column(df_pm)
 
-            st.dataframe(df_pm)
+            st.dataframe(df_pm.drop(columns=[PersonKey.COLUMN]))
 
             unique_panels = df_pm[pm_column_panel].unique().tolist()
 
 
             df_dashboard = df_dashboard[df_dashboard_selected_columns]
             
-            # rename columns
-            df_dashboard.rename(columns={
+            # rename columns (Dashboard-Spalten auf die Spaltennamen der Grantees-Tabelle abbilden)
+            df_dashboard = df_dashboard.rename(columns={
                 dashboard_column_researcher: "Name",
                 dashboard_column_host_country: pm_column_country,
-            }, inplace=True)
+                dashboard_column_aconym: pm_column_aconym,
+                dashboard_column_project_title: pm_column_project_title,
+                dashboard_column_abstract: pm_column_abstract,
+                dashboard_column_institution: pm_column_institution,
+                dashboard_column_call: pm_column_call,
+                dashboard_column_domain: pm_column_domain,
+                dashboard_column_panel: pm_column_panel,
+                dashboard_column_cordis_link: pm_column_cordis_link,
+            })
+            df_dashboard = PersonKey.add_column(df_dashboard)
             # Neue Spalte mit Länderkürzel
-            df_dashboard[pm_column_country] = df_dashboard[pm_column_country].apply(get_country_code)
+            df_dashboard[pm_column_country] = map_country_codes(df_dashboard[pm_column_country])
 
 
             # select from Life Sciences (LS) only the word in ()
@@ -357,8 +439,11 @@ with tab3:
             df_dashboard = df_dashboard[df_dashboard[pm_column_panel].isin(unique_panels)]
 
             st.subheader("Zusammengeführte Daten")
-            # merge both dataframes on Name
-            df_combined = pd.concat([df_pm, df_dashboard], ignore_index=True, sort=False)
+            # Upsert über Akronym + Call (bzw. Name + Call): keine doppelten Projekte, kein Vergleich der Abstracts
+            df_combined = merge_grantee_projects(
+                df_pm, df_dashboard, acronym=pm_column_aconym, call=pm_column_call, name="Name",
+                dashboard_wins=[pm_column_abstract, pm_column_cordis_link],
+            )
             # Maske erstellen
             mask = df_combined[pm_column_last_name].isnull() & df_combined[pm_column_first_name].isnull()
 
@@ -376,11 +461,11 @@ with tab3:
             # Zuweisung der aufgeteilten Namen
             df_combined.loc[mask, [pm_column_first_name, pm_column_last_name]] = split_names
 
-            df_combined = df_combined.drop_duplicates().reset_index(drop=True).drop(columns=['Name'])
+            df_combined = df_combined.reset_index(drop=True).drop(columns=['Name', PersonKey.COLUMN])
 
-            # remove [...] from column dashboard_column_institution
-            if dashboard_column_institution in df_combined.columns:
-                df_combined[dashboard_column_institution] = df_combined[dashboard_column_institution].str.replace(r'\s*\[.*?\]\s*', '', regex=True)
+            # remove [...] from column pm_column_institution
+            if pm_column_institution in df_combined.columns:
+                df_combined[pm_column_institution] = df_combined[pm_column_institution].str.replace(r'\s*\[.*?\]\s*', '', regex=True)
 
 
             st.dataframe(df_combined)
@@ -389,11 +474,11 @@ with tab3:
             st.subheader("💾 Aktualisierte Datei mit beiden Tabellenblättern herunterladen")
 
             # Datei mit allen Tabellenblättern laden
-            excel_data = pd.ExcelFile(grantees_and_panel_member_excel)
-            all_sheets = {sheet: excel_data.parse(sheet) for sheet in excel_data.sheet_names}
+            excel_bytes = grantees_and_panel_member_excel.getvalue()
+            all_sheets = {sheet: load_sheet(excel_bytes, sheet) for sheet in load_sheet_names(excel_bytes)}
 
             # Ersetze die Tabellenblätter "sheet_name" und "sheet_name_gapme"
-            all_sheets[sheet_name] = df_gapm  # Aktualisiertes DataFrame für sheet_name
+            all_sheets[sheet_name] = df_gapm.drop(columns=[PersonKey.COLUMN], errors="ignore")  # Aktualisiertes DataFrame für sheet_name
             all_sheets[sheet_name_gapme] = df_combined  # Aktualisiertes DataFrame für sheet_name_gapme
 
             # Speichere die Datei mit den aktualisierten Tabellenblättern
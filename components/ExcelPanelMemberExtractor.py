@@ -27,6 +27,7 @@ class ExcelPanelMemberExtractor:
 
         Args:
             excel_path (str): Pfad zur Excel-Datei.
+            year (int): Nur Einträge dieses Jahres (None: alle Jahre).
 
         Returns:
             pd.DataFrame: Eine DataFrame mit den Spalten:
@@ -49,7 +50,8 @@ class ExcelPanelMemberExtractor:
         df_excel['year'] = df_excel['year'].astype(int)
 
         # print only the rows where year == erc_date
-        df_excel = df_excel[df_excel['year'] == year]
+        if year is not None:
+            df_excel = df_excel[df_excel['year'] == year]
 
         # strip whitespace from Name column
         df_excel['Name'] = df_excel['Name'].str.strip()
@@ -0,0 +1,171 @@
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+# eigene Module
+from app.PersonKey import PersonKey
+
+
+class NameMatcher:
+    """
+    Unscharfer Namensabgleich mit Blocking-Index (PDF-Namen gegen die Excel-Stammliste, Dashboard gegen Grantees).
+
+    Ein exakter Vergleich über die Spalte 'Name' verpasst Schreibvarianten wie „José García“ / „Jose Garcia“,
+    „Sara van de Geer“ / „Sara Van De Geer“ oder aus der PDF zusammengeklebte Namen („FrankVerstraete“).
+    Ein Vergleich jeder PDF-Zeile mit jeder Excel-Zeile wäre O(n×m). Deshalb werden die Stammnamen beim Aufbau
+    einmal in Blöcke einsortiert (Präfix des Nachnamens und phonetischer Schlüssel des Nachnamens) und pro Anfrage
+    nur die Kandidaten aus den passenden Blöcken bewertet.
+
+    Beispiel:
+        >>> matcher = NameMatcher(df_excel["Name"])
+        >>> matcher.match("FrankVerstraete")
+        ('Frank Verstraete', 1.0)
+        >>> df = matcher.join(df_pdf, df_excel, left_on="Chair", right_on="Name")
+    """
+
+    def __init__(self, names, min_score: float = 0.85, prefix_length: int = 3):
+        """
+        Args:
+            names: Stammnamen (z. B. `df_excel["Name"]`), doppelte Einträge werden nur einmal indiziert
+            min_score: Mindestkonfidenz (0..1), ab der ein Kandidat als Treffer gilt
+            prefix_length: Länge des Nachnamen-Präfixes für das Blocking
+        """
+        self.min_score = min_score
+        self.prefix_length = prefix_length
+        self.exact = {}  # Normalisierter Name -> erster Stammname
+        self.blocks = defaultdict(set)  # Blockschlüssel -> normalisierte Namen
+        for name in pd.Series(names).dropna().astype(str).unique():
+            for key in self.variants(name):
+                if key in self.exact:
+                    continue
+                self.exact[key] = name
+                for block in self.block_keys(key):
+                    self.blocks[block].add(key)
+        self._cache = {}
+
+    @staticmethod
+    def split_glued(name: str) -> str:
+        """Trennt zusammengeklebte Namen aus der PDF-Extraktion („FrankVerstraete“ -> „Frank Verstraete“)."""
+        return re.sub(r"([a-zà-ÿ])([A-ZÀ-Þ])", r"\1 \2", name)
+
+    @classmethod
+    def normalize(cls, name, split_glued: bool = True) -> str:
+        """Vergleichsform: `PersonKey` des Namens, optional nach Trennung von Klebenamen."""
+        return PersonKey.of(cls.split_glued(str(name)) if split_glued else str(name))
+
+    @classmethod
+    def variants(cls, name) -> list[str]:
+        """
+        Vergleichsformen mit und ohne Trennung von Klebenamen.
+
+        „McNeill“ oder „DeFranco“ sind keine Klebenamen, werden aber wie „FrankVerstraete“ getrennt.
+        Mit beiden Formen passen sie sowohl zu „MCNEILL“ als auch zu „Mc Neill“.
+        """
+        return [key for key in dict.fromkeys((cls.normalize(name), cls.normalize(name, split_glued=False))) if key]
+
+    @staticmethod
+    def split(key: str) -> tuple[str, str]:
+        """Zerlegt einen Personenschlüssel in (Vorname, Kern-Nachname ohne Namenszusätze, siehe `PersonKey.surname`)."""
+        tokens = key.split()
+        return (tokens[0] if len(tokens) > 1 else ""), PersonKey.surname(key)
+
+    @staticmethod
+    def phonetic(word: str) -> str:
+        """Soundex-Code eines Wortes (z. B. 'meyer' und 'maier' -> 'M600')."""
+        codes = {**dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"),
+                 "l": "4", **dict.fromkeys("mn", "5"), "r": "6"}
+        word = "".join(c for c in word if c.isalpha())
+        if not word:
+            return ""
+        result, previous = word[0].upper(), codes.get(word[0], "")
+        for char in word[1:]:
+            code = codes.get(char, "")
+            if code and code != previous:
+                result += code
+            if char not in "hw":
+                previous = code
+        return (result + "000")[:4]
+
+    def block_keys(self, key: str) -> set[tuple]:
+        _, surname = self.split(key)
+        return {("prefix", surname[:self.prefix_length]), ("phonetic", self.phonetic(surname))}
+
+    @classmethod
+    def score(cls, a: str, b: str) -> float:
+        """
+        Konfidenz (0..1), dass zwei normalisierte Namen dieselbe Person bezeichnen.
+
+        Der Nachname zählt stärker als der Vorname; ein abgekürzter Vorname („S. van de Geer“) passt zum vollen
+        Vornamen mit gleichem Anfangsbuchstaben. Zusätzlich wird der Gesamtname verglichen (Mittelnamen, Zusätze).
+        """
+        if a == b:
+            return 1.0
+        first_a, last_a = cls.split(a)
+        first_b, last_b = cls.split(b)
+        surname = SequenceMatcher(None, last_a, last_b).ratio()
+        if not first_a or not first_b:
+            given = 0.5
+        elif len(first_a) == 1 or len(first_b) == 1:
+            given = 1.0 if first_a[0] == first_b[0] else 0.0
+        else:
+            given = SequenceMatcher(None, first_a, first_b).ratio()
+        full = SequenceMatcher(None, a.replace(" ", ""), b.replace(" ", "")).ratio()
+        return round(0.5 * surname + 0.2 * given + 0.3 * full, 3)
+
+    def candidates(self, key: str) -> set[str]:
+        """Normalisierte Stammnamen aus allen Blöcken des Namens."""
+        found = set()
+        for block in self.block_keys(key):
+            found |= self.blocks.get(block, set())
+        return found
+
+    def match(self, name) -> tuple[str | None, float]:
+        """
+        Bester Stammname für einen Namen.
+
+        Returns:
+            (Stammname, Konfidenz) oder (None, beste Konfidenz), wenn kein Kandidat `min_score` erreicht
+        """
+        if name is None or pd.isna(name):
+            return None, 0.0
+        keys = self.variants(name)
+        key = keys[0] if keys else ""
+        if key in self._cache:
+            return self._cache[key]
+        exact = next((k for k in keys if k in self.exact), None)
+        if exact is not None:
+            result = (self.exact[exact], 1.0)
+        else:
+            best, best_score = None, 0.0
+            for variant in keys:
+                for candidate in self.candidates(variant):
+                    candidate_score = self.score(variant, candidate)
+                    if candidate_score > best_score:
+                        best, best_score = candidate, candidate_score
+            result = (self.exact[best], best_score) if best is not None and best_score >= self.min_score else (None, best_score)
+        self._cache[key] = result
+        return result
+
+    def match_series(self, names: pd.Series) -> pd.DataFrame:
+        """Treffer für eine ganze Spalte (jeder unterschiedliche Name wird nur einmal abgeglichen)."""
+        results = {name: self.match(name) for name in names.dropna().unique()}
+        matched = names.map(lambda name: results.get(name, (None, 0.0)))
+        return pd.DataFrame({
+            "match": matched.str[0],
+            "match_score": matched.str[1].astype(float),
+        }, index=names.index)
+
+    def join(self, left: pd.DataFrame, right: pd.DataFrame, left_on: str, right_on: str, how: str = "left",
+             suffixes: tuple = ("_left", "_right")) -> pd.DataFrame:
+        """
+        Verbindet zwei DataFrames über den besten Namens-Treffer statt über exakte Gleichheit.
+
+        Die Stammnamen des Matchers müssen aus `right[right_on]` stammen. Das Ergebnis enthält zusätzlich
+        die Spalte 'match_score' (1.0 = exakt bzw. nur in Schreibweise verschieden, NaN = kein Treffer).
+        """
+        matches = self.match_series(left[left_on])
+        left = left.assign(_match=matches["match"], match_score=matches["match_score"].where(matches["match"].notna()))
+        merged = left.merge(right, left_on="_match", right_on=right_on, how=how, suffixes=suffixes)
+        return merged.drop(columns="_match")
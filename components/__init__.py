@@ -1,3 +1,4 @@
 from components.PdfMemberExtractor import PdfMemberExtractor
+from components.NameMatcher import NameMatcher
 
-__all__ = ["PdfMemberExtractor", "PdfChairExtractor", "ExcelPanelMemberExtractor"]
+__all__ = ["PdfMemberExtractor", "PdfChairExtractor", "ExcelPanelMemberExtractor", "NameMatcher"]
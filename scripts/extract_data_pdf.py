@@ -1,114 +1,156 @@
+"""
+Panel-Mitglieder und Chairs aus ERC-PDFs mit den Panels aus panel-members-excel.xls zusammenführen
 
-from components.PdfMemberExtractor import PdfMemberExtractor
-import pandas as pd
-
-
-
-extractor = PdfMemberExtractor()
-df_pdf = extractor.extract(pdf_path="../data/2024/ERC-2024-AdG-panel-members.pdf")
-df_pdf['ERC-Date'] = df_pdf['ERC-Date'].astype(int)
-erc_date = int(df_pdf['ERC-Date'].unique()[0])
-
-print("\n##########"*5)
-print("PDF DataFrame:")
-print(df_pdf.head())
-
-
-
-
+Für jede PDF werden Chairs und Members extrahiert (`PdfMemberExtractor`), jedem Chair wird über einen
+Join auf (Name, Jahr, Förderlinie) sein Review-Panel aus der Excel-Datei zugeordnet, und alle Mitglieder
+erhalten das Panel ihres Chairs. Mehrere Jahre und Förderlinien werden in einem Aufruf verarbeitet.
 
-# Read panel-members-excel.xls
-excel_path = "../data/panel-members-excel.xls"
+Ergebnis: eine Zeile pro Person und Panel mit den Spalten
+['first name', 'last name', 'function', 'panel', 'call', 'domain'].
 
-df_excel = pd.read_excel(excel_path, engine='openpyxl')
+Beispiel:
+    >>> df = build_panel_member_table(
+    ...     ["../data/2024/ERC-2024-AdG-panel-members.pdf", "../data/2025/ERC-2025-StG-panel-members.pdf"],
+    ...     excel_path="../data/panel-members-excel.xls",
+    ... )
+"""
 
-# split column year at "," and copy the row for each year
-df_excel = df_excel.assign(year=df_excel['year'].astype(str).str.split(',')).explode('year')
-
-# strip whitespace und entferne leere/ungültige Einträge (nur 4-stellige Jahreszahlen)
-df_excel['year'] = df_excel['year'].str.strip()
-df_excel = df_excel[df_excel['year'].str.match(r'^\s*\d{4}\s*$', na=False)].copy()
-
-# year in int konvertieren
-df_excel['year'] = df_excel['year'].astype(int)
-
-# print only the rows where year == erc_date
-df_excel = df_excel[df_excel['year'] == erc_date]
-
-# strip whitespace from Name column
-df_excel['Name'] = df_excel['Name'].str.strip()
+import re
+from pathlib import Path
 
+import pandas as pd
 
-print("\n##########"*5)
-print("Excel DataFrame:")
-print(df_excel.head())
+from components.ExcelPanelMemberExtractor import ExcelPanelMemberExtractor
+from components.NameMatcher import NameMatcher
+from components.PdfMemberExtractor import PdfMemberExtractor
 
 
-for chair in df_pdf['Chair'].unique():
-    df_pdf_chair = df_pdf[df_pdf['Chair'] == chair]
-    print(df_pdf_chair)
-    
-    # Safe lookup mit Fallback
-    matches = df_excel.loc[df_excel['Name'] == chair, 'review_panel']
-    if len(matches) > 0:
-        chair_review_panel = matches.values[0]
-    else:
+OUTPUT_COLUMNS = ['first name', 'last name', 'function', 'panel', 'call', 'domain']
+
+# Schreibweisen der Förderlinien in den PDF-Dateinamen
+FUNDING_SCHEMES = {
+    'stg': 'StG', 'starting': 'StG',
+    'cog': 'CoG', 'consolidator': 'CoG',
+    'adg': 'AdG', 'advanced': 'AdG',
+    'syg': 'SyG', 'synergy': 'SyG',
+    'poc': 'PoC',
+}
+
+
+def scheme_from_path(pdf_path):
+    """Förderlinie aus dem Dateinamen, z. B. 'ERC-2024-AdG-panel-members.pdf' -> 'AdG' (None, wenn unbekannt)."""
+    for word in re.split(r'[^a-z]+', Path(pdf_path).stem.lower()):
+        if word in FUNDING_SCHEMES:
+            return FUNDING_SCHEMES[word]
+    return None
+
+
+def extract_pdfs(pdf_paths, extractor=None):
+    """
+    Extrahiert Chairs und Members aus mehreren PDFs.
+
+    Returns:
+        pd.DataFrame mit den Spalten Chair, Member, year, funding_scheme, source
+    """
+    extractor = extractor or PdfMemberExtractor()
+    frames = []
+    for pdf_path in pdf_paths:
+        df = extractor.extract(pdf_path=str(pdf_path))
+        # Jahr aus der PDF, sonst aus dem Dateinamen
+        year = pd.to_numeric(df['ERC-Date'], errors='coerce')
+        file_year = re.search(r'(\d{4})', Path(pdf_path).stem)
+        if file_year:
+            year = year.fillna(int(file_year.group(1)))
+        frames.append(df.assign(year=year, funding_scheme=scheme_from_path(pdf_path), source=str(pdf_path)))
+    df_pdf = pd.concat(frames, ignore_index=True).drop(columns=['ERC-Date'])
+    df_pdf = df_pdf.dropna(subset=['year'])
+    df_pdf['year'] = df_pdf['year'].astype(int)
+    return df_pdf
+
+
+def infer_funding_schemes(df_pdf, df_excel, matcher):
+    """
+    Ergänzt fehlende Förderlinien (unbekannter Dateiname) mit der häufigsten Förderlinie der Mitglieder
+    dieser PDF im selben Jahr laut Excel-Datei.
+    """
+    missing = df_pdf['funding_scheme'].isna()
+    if not missing.any():
+        return df_pdf
+    people = pd.concat([
+        df_pdf.loc[missing, ['source', 'year', 'Chair']].rename(columns={'Chair': 'name'}),
+        df_pdf.loc[missing, ['source', 'year', 'Member']].rename(columns={'Member': 'name'}),
+    ]).drop_duplicates()
+    people['Name'] = matcher.match_series(people['name'])['match']
+    people = people.merge(df_excel[['Name', 'year', 'funding_scheme']], on=['Name', 'year'], how='inner')
+    schemes = people.groupby('source')['funding_scheme'].agg(lambda s: s.mode().iat[0])
+    df_pdf.loc[missing, 'funding_scheme'] = df_pdf.loc[missing, 'source'].map(schemes)
+    return df_pdf
+
+
+def map_chair_panels(df_pdf, df_excel, matcher):
+    """
+    Ordnet jedem Chair sein Review-Panel zu (ein Join auf Name, Jahr und Förderlinie statt einer Schleife pro Chair).
+
+    Returns:
+        df_pdf mit zusätzlicher Spalte review_panel (None, wenn der Chair nicht in der Excel-Datei steht)
+    """
+    keys = ['Name', 'year', 'funding_scheme']
+    chairs = df_pdf[['Chair', 'year', 'funding_scheme']].drop_duplicates()
+    chairs['Name'] = matcher.match_series(chairs['Chair'])['match']
+    panels = df_excel.drop_duplicates(keys)[keys + ['review_panel']]
+    chairs = chairs.merge(panels, on=keys, how='left')
+
+    for chair in chairs.loc[chairs['review_panel'].isna(), 'Chair']:
         print(f"WARNING: Chair '{chair}' not found in Excel - setting review_panel to None")
-        chair_review_panel = None  # oder einen Standardwert wie "UNKNOWN"
-    
-    df_pdf.loc[df_pdf['Chair'] == chair, 'review_panel'] = chair_review_panel
-
-for chair in df_pdf['Chair'].unique():
-    df_pdf_chair = df_pdf[df_pdf['Chair'] == chair]
-    print(df_pdf_chair)
-
-
-df_pdf = df_pdf.melt(
-    id_vars=['ERC-Date', 'review_panel'],
-    value_vars=['Chair', 'Member'],
-    var_name='function',
-    value_name='name'
-)
-
-df_pdf['function'] = df_pdf['function'].str.lower()        # "chair" / "member"
-df_pdf['name'] = df_pdf['name'].astype(str).str.strip()
-df_pdf = df_pdf[df_pdf['name'] != ''].reset_index(drop=True)
-
-# Spalten umbenennen / anordnen
-
-df_pdf = df_pdf[['name', 'function', 'ERC-Date', 'review_panel']]
-df_pdf = df_pdf.drop_duplicates().reset_index(drop=True)
-
-
-
-
-df_merged = pd.merge(df_pdf, df_excel, left_on='name', right_on='Name', how='left', indicator=True, suffixes=('_pdf', '_excel'))
-
-
-funding_scheme_name = df_merged.loc[df_merged["funding_scheme"].notnull()]["funding_scheme"].unique()[0]
-
-# fill NaN in funding_scheme with the unique value
-df_merged['funding_scheme'] = df_merged['funding_scheme'].fillna(funding_scheme_name)
-
-
-
-
-df = df_merged.loc[:, ['name', 'function', "ERC-Date", "review_panel_pdf", "funding_scheme"]].rename(columns={"review_panel_pdf": "panel", "ERC-Date": "year"})
-df["call"] = df["funding_scheme"] + " " + df["year"].astype(str)
-
-# get from panel the first word (e.g "PE1" -> "PE")
-df["domain"] = df["panel"].str.split().str[0].str[:-1]
-
-df.drop(columns=["year", "funding_scheme"], inplace=True)
-
-
-# split name into first_name and last_name
-df[['first name', 'last name']] = df['name'].str.rsplit(' ', n=1, expand=True)
-df.drop(columns=['name'], inplace=True)
-
-print("\n##########"*5)
-print("Merged Dataframe:")
-print(df.head())
-
-print("\n")
-print(df["first name"].unique())
+    return df_pdf.merge(chairs.drop(columns='Name'), on=['Chair', 'year', 'funding_scheme'], how='left')
+
+
+def build_panel_member_table(pdf_paths, excel_path="../data/panel-members-excel.xls", extractor=None):
+    """
+    Pipeline: PDFs extrahieren, Panels der Chairs zuordnen, in das Tabellenformat der Arbeitsmappen bringen.
+
+    Args:
+        pdf_paths: Pfade der Panel-Member-PDFs (beliebige Jahre und Förderlinien)
+        excel_path: Pfad zu panel-members-excel.xls
+        extractor: Optional eigener `PdfMemberExtractor`
+
+    Returns:
+        pd.DataFrame mit den Spalten first name, last name, function, panel, call, domain
+    """
+    df_pdf = extract_pdfs(pdf_paths, extractor=extractor)
+    df_excel = ExcelPanelMemberExtractor().extract(excel_path=excel_path, year=None)
+
+    # Unscharfer Abgleich gegen die Excel-Namen (Diakritika, Namenszusätze, zusammengeklebte Namen)
+    matcher = NameMatcher(df_excel['Name'])
+    df_pdf = infer_funding_schemes(df_pdf, df_excel, matcher)
+    df_pdf = map_chair_panels(df_pdf, df_excel, matcher)
+
+    df = df_pdf.melt(
+        id_vars=['year', 'funding_scheme', 'review_panel'],
+        value_vars=['Chair', 'Member'],
+        var_name='function',
+        value_name='name'
+    )
+    df['function'] = df['function'].str.lower()        # "chair" / "member"
+    df['name'] = df['name'].astype(str).str.strip()
+    df = df[df['name'] != ''].drop_duplicates().reset_index(drop=True)
+
+    df = df.rename(columns={'review_panel': 'panel'})
+    df['call'] = df['funding_scheme'] + " " + df['year'].astype(str)
+    # Domain = Buchstaben des Panels (z. B. "PE10" -> "PE")
+    df['domain'] = df['panel'].str.extract(r'^([A-Za-z]+)', expand=False)
+
+    # split name into first_name and last_name
+    df[['first name', 'last name']] = df['name'].str.rsplit(' ', n=1, expand=True).reindex(columns=[0, 1])
+    return df[OUTPUT_COLUMNS]
+
+
+if __name__ == "__main__":
+    df = build_panel_member_table(["../data/2024/ERC-2024-AdG-panel-members.pdf"])
+
+    print("\n##########"*5)
+    print("Merged Dataframe:")
+    print(df.head())
+
+    print("\n")
+    print(df["first name"].unique())
@@ -0,0 +1,142 @@
+"""
+Vektorisierte Field-of-Study-Analysen für viele Autoren
+
+Arbeitet auf Paper-Records, wie sie `FieldOfStudyAnalyzer.get_cohort_records` liefert
+(eine Zeile pro Autor × Paper × Field mit den Spalten author_id, paper_id, year, field, citations).
+Alle Funktionen berechnen die Kennzahlen für alle Autoren gleichzeitig und geben DataFrames zurück,
+statt pro Autor auszugeben.
+
+Beispiel:
+    >>> records = analyzer.get_cohort_records(panel_author_ids)
+    >>> report = panel_field_report(records, top_n=5)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+RECORD_COLUMNS = ['author_id', 'paper_id', 'year', 'field', 'citations']
+
+
+def records_from_analysis(analysis):
+    """Wandelt das Ergebnis von `FieldOfStudyAnalyzer.get_fields_overview` (ein Autor) in Paper-Records um."""
+    author_id = analysis['author'].authorId
+    rows = [
+        (author_id, paper.get('paperId') or paper['title'], paper['year'], field, paper['citations'] or 0)
+        for field, papers in analysis['field_papers'].items()
+        for paper in papers
+    ]
+    return pd.DataFrame(rows, columns=RECORD_COLUMNS)
+
+
+def field_year_counts(records):
+    """
+    Papers und Zitationen pro Autor × Field × Jahr.
+
+    Returns:
+        pd.DataFrame mit MultiIndex (author_id, field, year) und den Spalten papers, citations
+    """
+    return records.groupby(['author_id', 'field', 'year']).agg(
+        papers=('paper_id', 'nunique'),
+        citations=('citations', 'sum'),
+    )
+
+
+def field_year_pivot(records, value='papers'):
+    """
+    Pivot-Tabelle Autor × Field (Zeilen) gegen Jahr (Spalten).
+
+    Args:
+        records: Paper-Records
+        value: 'papers' oder 'citations'
+    """
+    return field_year_counts(records)[value].unstack('year', fill_value=0).sort_index(axis=1)
+
+
+def field_summary(records):
+    """
+    Papers, Zitationen, Anteil und Rang jedes Fields pro Autor.
+
+    Der Anteil bezieht sich auf die Anzahl unterschiedlicher Papers des Autors (ein Paper kann mehrere Fields haben).
+
+    Returns:
+        pd.DataFrame mit MultiIndex (author_id, field) und den Spalten papers, citations, share, rank
+    """
+    summary = records.groupby(['author_id', 'field']).agg(
+        papers=('paper_id', 'nunique'),
+        citations=('citations', 'sum'),
+    )
+    total_papers = records.groupby('author_id')['paper_id'].nunique()
+    summary['share'] = summary['papers'] / total_papers.reindex(summary.index.get_level_values('author_id')).to_numpy()
+    summary['rank'] = (
+        summary.groupby(level='author_id')['papers']
+        .rank(method='first', ascending=False)
+        .astype(int)
+    )
+    return summary.sort_values(['author_id', 'rank'])
+
+
+def field_trends(records, window=6, recent=3, reference_year=None):
+    """
+    Trend jedes Fields pro Autor über die letzten `window` Jahre.
+
+    Fehlende Jahre zählen als 0 Papers. Berechnet werden:
+    - slope: Steigung der linearen Regression (Papers pro Jahr)
+    - avg_recent / avg_older: Mittelwert der letzten `recent` Jahre bzw. der Jahre davor
+    - trend: 'steigend' (> 120 %), 'abnehmend' (< 80 %) oder 'stabil', wie in `analyze_field_evolution`
+
+    Args:
+        records: Paper-Records
+        window: Anzahl der betrachteten Jahre
+        recent: Anzahl der "aktuellen" Jahre innerhalb des Fensters
+        reference_year: Letztes Jahr des Fensters (Standard: jüngstes Jahr in den Daten)
+
+    Returns:
+        pd.DataFrame mit MultiIndex (author_id, field) und den Spalten slope, avg_recent, avg_older, trend
+    """
+    records = records.dropna(subset=['year'])
+    if records.empty:
+        return pd.DataFrame(columns=['slope', 'avg_recent', 'avg_older', 'trend'])
+    reference_year = int(reference_year or records['year'].max())
+    years = np.arange(reference_year - window + 1, reference_year + 1)
+
+    in_window = records[records['year'].astype(int).isin(years)]
+    counts = (
+        in_window.groupby(['author_id', 'field', in_window['year'].astype(int)])['paper_id'].nunique()
+        .unstack('year', fill_value=0)
+        .reindex(columns=years, fill_value=0)
+    )
+    values = counts.to_numpy(dtype=float)
+
+    # Geschlossene Lösung der linearen Regression für alle Zeilen gleichzeitig
+    x = years - years.mean()
+    slope = values @ x / (x @ x)
+    avg_recent = values[:, -recent:].mean(axis=1)
+    avg_older = values[:, :-recent].mean(axis=1) if window > recent else np.zeros(len(values))
+    trend = np.select(
+        [avg_recent > avg_older * 1.2, avg_recent < avg_older * 0.8],
+        ['steigend', 'abnehmend'],
+        default='stabil',
+    )
+    return pd.DataFrame(
+        {'slope': slope, 'avg_recent': avg_recent, 'avg_older': avg_older, 'trend': trend},
+        index=counts.index,
+    )
+
+
+def panel_field_report(records, top_n=5, window=6, recent=3, reference_year=None):
+    """
+    Kombinierter Panel-Report: Top-n Fields pro Autor mit Anteil, Rang, Zitationen und Trend.
+
+    Returns:
+        pd.DataFrame mit einer Zeile pro Autor × Field (nur Fields mit rank <= top_n)
+    """
+    summary = field_summary(records)
+    summary = summary[summary['rank'] <= top_n]
+    trends = field_trends(records, window=window, recent=recent, reference_year=reference_year)
+    report = summary.join(trends, how='left')
+    report['slope'] = report['slope'].fillna(0.0)
+    report['avg_recent'] = report['avg_recent'].fillna(0.0)
+    report['avg_older'] = report['avg_older'].fillna(0.0)
+    report['trend'] = report['trend'].fillna('stabil')
+    return report.reset_index()
@@ -0,0 +1,99 @@
+"""
+Startzeit-Benchmark für die Einstiegspunkte der App
+
+Misst für jeden Einstiegspunkt in einem frischen Python-Prozess die Importzeit, den Speicherbedarf (RSS)
+und welche schweren Pakete (Selenium, torch, transformers, ...) dabei bereits geladen werden.
+Die Streamlit-Skripte werden im "bare mode" ohne Server ausgeführt (ohne hochgeladene Dateien),
+das entspricht dem Kaltstart bzw. einem Rerun ohne Eingaben.
+
+Aufruf (aus dem Repository-Wurzelverzeichnis):
+    python scripts/startup_benchmark.py
+    python scripts/startup_benchmark.py --repeat 5 --budget-ms 3000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Name -> (Arbeitsverzeichnis, Code, der im frischen Prozess ausgeführt wird)
+ENTRY_POINTS = {
+    "app/helper_functions": ("app", "import helper_functions"),
+    "app/streamlit.py": ("app", "import runpy; runpy.run_path('streamlit.py', run_name='__main__')"),
+    "scripts/streamlit.py": ("scripts", "import runpy; runpy.run_path('streamlit.py', run_name='__main__')"),
+}
+
+# Pakete, die beim Start nicht geladen sein sollten
+HEAVY_MODULES = ["selenium", "torch", "transformers", "bs4", "pycountry", "requests", "semanticscholar", "pdfplumber"]
+
+MEASURE = """
+import resource, sys, time, json, io, contextlib
+sys.path.append('.')  # installierte Pakete (z. B. streamlit) vor gleichnamigen Skripten
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+    try:
+        exec({code!r})
+        error = None
+    except BaseException as e:
+        error = f"{{type(e).__name__}}: {{e}}"
+duration = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": duration,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+    "error": error,
+}}))
+"""
+
+
+def measure(name, repeat=3):
+    """Führt einen Einstiegspunkt `repeat`-mal in einem frischen Prozess aus und gibt Median-Zeit und RSS zurück."""
+    workdir, code = ENTRY_POINTS[name]
+    # Caches (SQLite-Dateien) in ein temporäres Verzeichnis, damit der Benchmark keine Daten im Repository anlegt
+    env = {**os.environ, "ERC_CACHE_DIR": tempfile.mkdtemp(prefix="erc_benchmark_")}
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-P", "-c", MEASURE.format(code=code, heavy=HEAVY_MODULES)],
+            cwd=os.path.join(ROOT, workdir), env=env, capture_output=True, text=True,
+        )
+        lines = output.stdout.strip().splitlines()
+        if output.returncode != 0 or not lines:
+            return {"name": name, "error": output.stderr.strip().splitlines()[-1] if output.stderr.strip() else "kein Ergebnis"}
+        runs.append(json.loads(lines[-1]))
+    return {
+        "name": name,
+        "ms": statistics.median(run["seconds"] for run in runs) * 1000,
+        "rss_mb": statistics.median(run["rss_mb"] for run in runs),
+        "heavy": runs[-1]["heavy"],
+        "error": runs[-1]["error"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importzeit und Speicherbedarf der App-Einstiegspunkte messen")
+    parser.add_argument("--repeat", type=int, default=3, help="Anzahl der Messungen pro Einstiegspunkt (Median)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Zeitbudget pro Einstiegspunkt; Exit-Code 1 bei Überschreitung")
+    parser.add_argument("entry_points", nargs="*", default=list(ENTRY_POINTS), help="Einstiegspunkte (Standard: alle)")
+    args = parser.parse_args()
+
+    over_budget = False
+    for name in args.entry_points:
+        result = measure(name, repeat=args.repeat)
+        if "ms" not in result:
+            print(f"❌ {name}: {result['error']}")
+            continue
+        heavy = ", ".join(result["heavy"]) or "-"
+        print(f"⏱️ {name}: {result['ms']:.0f} ms, {result['rss_mb']:.0f} MB RSS, schwere Pakete geladen: {heavy}")
+        if result["error"]:
+            print(f"   ⚠️ Abbruch beim Ausführen: {result['error']}")
+        if args.budget_ms is not None and result["ms"] > args.budget_ms:
+            print(f"   ❌ Budget von {args.budget_ms:.0f} ms überschritten")
+            over_budget = True
+    sys.exit(1 if over_budget else 0)
@@ -1,41 +1,14 @@
 import streamlit as st
 import pandas as pd
 import time
-import requests
 # import ollama
 import random
 from pprint import pprint
-import pycountry
-
-# Driver for Firefox, Chrome, Edge, etc.
-from selenium import webdriver
-from random import uniform
-
-# Mode of locating html elements: ID, CSS_SELECTOR, XPATH, ...
-from selenium.webdriver.common.by import By               
-
-# Using specific keyboard keys like ENTER, ESCAPE, ...
-from selenium.webdriver.common.keys import Keys
-
-# Methods for dropdown
-from selenium.webdriver.support.select import Select
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from random import uniform
 from time import sleep
-from pprint import pprint
-
-import pandas as pd
-from time import sleep
-from pprint import pprint
-
-
-import random
 import tempfile
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
+
+# Selenium und pycountry werden erst in den Methoden geladen, die sie brauchen (schnellerer App-Start)
 
 
 class RandomFirefoxProfile:
@@ -63,6 +36,8 @@ class RandomFirefoxProfile:
     def create():
         """Erstellt ein zufälliges Firefox-Profil."""
         
+        from selenium import webdriver
+
         # Temporäres Profil
         temp_dir = tempfile.mkdtemp(prefix="firefox_")
         profile = webdriver.FirefoxProfile(temp_dir)
@@ -113,6 +88,9 @@ class ResearchGateSelenium:
         """Initialisiert den Firefox WebDriver."""
         if self.driver is not None:
             return self.driver
+
+        from selenium import webdriver
+        from selenium.webdriver.firefox.service import Service
         
         options = webdriver.FirefoxOptions()
         if self.headless:
@@ -169,6 +147,9 @@ class ResearchGateSelenium:
     
     def klick_privacy_accept(self):
         """Klickt auf Privacy-Accept-Button."""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
         try:
             self.random_sleep(1, 2)
             wait = WebDriverWait(self.driver, 10)
@@ -182,6 +163,7 @@ class ResearchGateSelenium:
     
     def find_skills(self):
         """Extrahiert Skills vom ResearchGate-Profil."""
+        from selenium.webdriver.common.by import By
         
         # 1. Driver initialisieren
         self.get_driver()
@@ -264,6 +246,8 @@ class ORCIDClient:
     @staticmethod
     def get_profile(orcid_id: str) -> dict | None:
         """Holt vollständiges ORCID-Profil."""
+        import requests
+
         url = f"{ORCIDClient.BASE_URL}/{orcid_id}"
         headers = {'Accept': 'application/json'}
         
@@ -361,6 +345,8 @@ class ORCIDClient:
     @staticmethod
     def get_keywords(orcid_id: str) -> list[str]:
         """Holt nur Keywords."""
+        import requests
+
         url = f"{ORCIDClient.BASE_URL}/{orcid_id}/keywords"
         headers = {'Accept': 'application/json'}
         
@@ -459,6 +445,8 @@ class ORCIDClient:
 # Hilfsfunktionen
 # -----------------------------
 def fetch_openalex_id(name: str) -> dict | None:
+    import requests
+
     search_name = name.replace(" ", "+")
     base_url = f"https://api.openalex.org/authors?filter=display_name.search:{search_name}"
     response = requests.get(base_url)
@@ -519,6 +507,7 @@ def fetch_openalex_id(name: str) -> dict | None:
 
 # Funktion, um den ISO-Alpha-2-Code zu bekommen
 def get_country_code(name):
+    import pycountry
     try:
         return pycountry.countries.lookup(name).alpha_2
     except LookupError:
@@ -534,6 +523,8 @@ def fetch_openalex_orcid_only(name: str) -> str | None:
     Returns:
         ORCID-ID als String oder None
     """
+    import requests
+
     search_name = name.replace(" ", "+")
     base_url = f"https://api.openalex.org/authors?filter=display_name.search:{search_name}"
     
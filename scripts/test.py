@@ -9,11 +9,33 @@ Erstellt umfassende Übersichten über Forschungsfelder eines Wissenschaftlers
 
 from semanticscholar import SemanticScholar
 from collections import Counter, defaultdict
+from itertools import combinations as pairs
 import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Gleicher Cache-Ordner wie die App (data/cache im Projektverzeichnis), unabhängig vom Arbeitsverzeichnis
+DEFAULT_CACHE_DIR = os.getenv("ERC_CACHE_DIR") or str(Path(__file__).resolve().parent.parent / "data" / "cache")
 
 class FieldOfStudyAnalyzer:
-    def __init__(self, api_key=None):
+    # Nur diese Felder werden im Batch-Modus abgefragt
+    COHORT_AUTHOR_FIELDS = ['name', 'papers.paperId', 'papers.year', 'papers.citationCount', 'papers.fieldsOfStudy']
+    COHORT_PAPER_FIELDS = ['paperId', 'year', 'citationCount', 'fieldsOfStudy']
+    AUTHOR_BATCH_SIZE = 1000
+    PAPER_BATCH_SIZE = 500
+    # IDs, die eine Batch-Antwort nicht enthielt, werden so lange nicht erneut angefragt (Sekunden)
+    MISSING_TTL = 30 * 24 * 3600
+
+    def __init__(self, api_key=None, cache_path=None, min_interval=None):
         self.sch = SemanticScholar(api_key=api_key)
+        self.cache_path = cache_path or os.path.join(DEFAULT_CACHE_DIR, "semantic_scholar.db")
+        # Ohne API-Key erlaubt Semantic Scholar ca. 1 Anfrage pro Sekunde
+        self.min_interval = min_interval if min_interval is not None else (0.1 if api_key else 1.0)
+        self._last_request = 0.0
     
     def get_fields_overview(self, author_id, max_papers=200):
         """
@@ -37,6 +59,7 @@ class FieldOfStudyAnalyzer:
         field_by_year = defaultdict(lambda: defaultdict(int))
         field_citations = defaultdict(int)
         field_papers = defaultdict(list)
+        paper_fields = {}  # paperId -> Fields (für Co-Occurrence-Analyse)
         papers_with_fields = 0
         
         papers = author.papers[:max_papers] if author.papers else []
@@ -45,6 +68,7 @@ class FieldOfStudyAnalyzer:
             # Fields of Study sammeln
             if hasattr(paper, 'fieldsOfStudy') and paper.fieldsOfStudy:
                 papers_with_fields += 1
+                paper_fields[paper.paperId or paper.title] = set(paper.fieldsOfStudy)
                 for field in paper.fieldsOfStudy:
                     all_fields.append(field)
                     
@@ -58,6 +82,7 @@ class FieldOfStudyAnalyzer:
                     
                     # Papers pro Field speichern
                     field_papers[field].append({
+                        'paperId': paper.paperId,
                         'title': paper.title,
                         'year': paper.year,
                         'citations': paper.citationCount
@@ -75,10 +100,137 @@ class FieldOfStudyAnalyzer:
             'field_by_year': field_by_year,
             'field_citations': field_citations,
             'field_papers': field_papers,
+            'paper_fields': paper_fields,
             'total_papers': total_papers,
             'papers_with_fields': papers_with_fields
         }
     
+    # ------------------------------------------------------------------
+    # Batch-Modus für viele Autoren (z. B. ein ganzes Panel)
+    # ------------------------------------------------------------------
+
+    def _throttle(self):
+        """Wartet, bis das Rate-Limit eine weitere Anfrage erlaubt."""
+        wait = self.min_interval - (time.monotonic() - self._last_request)
+        if wait > 0:
+            time.sleep(wait)
+        self._last_request = time.monotonic()
+
+    def _cache_connect(self):
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.cache_path)
+        conn.execute("CREATE TABLE IF NOT EXISTS responses (kind TEXT, id TEXT, payload TEXT, PRIMARY KEY (kind, id))")
+        conn.execute("CREATE TABLE IF NOT EXISTS missing (kind TEXT, id TEXT, checked_at REAL, PRIMARY KEY (kind, id))")
+        return conn
+
+    def _cache_get(self, kind, ids):
+        with self._cache_connect() as conn:
+            rows = conn.execute(
+                f"SELECT id, payload FROM responses WHERE kind = ? AND id IN ({','.join('?' * len(ids))})",
+                [kind, *ids],
+            ).fetchall() if ids else []
+        return {id_: json.loads(payload) for id_, payload in rows}
+
+    def _cache_get_missing(self, kind, ids):
+        """IDs, die innerhalb von MISSING_TTL als nicht vorhanden gespeichert wurden."""
+        with self._cache_connect() as conn:
+            rows = conn.execute(
+                f"SELECT id FROM missing WHERE kind = ? AND checked_at > ? AND id IN ({','.join('?' * len(ids))})",
+                [kind, time.time() - self.MISSING_TTL, *ids],
+            ).fetchall() if ids else []
+        return {id_ for (id_,) in rows}
+
+    def _cache_put_missing(self, kind, ids):
+        with self._cache_connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO missing (kind, id, checked_at) VALUES (?, ?, ?)",
+                [(kind, id_, time.time()) for id_ in ids],
+            )
+
+    def _cache_put(self, kind, records):
+        with self._cache_connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO responses (kind, id, payload) VALUES (?, ?, ?)",
+                [(kind, id_, json.dumps(data)) for id_, data in records.items()],
+            )
+
+    def _fetch_batch(self, kind, ids, batch_size, fetch):
+        """
+        Holt IDs aus dem Cache, fehlende werden in Batches über die API geladen und gecacht.
+
+        IDs, die die API nicht liefert, werden als Fehlschlag gespeichert und bis MISSING_TTL nicht erneut angefragt;
+        sie fehlen im Ergebnis.
+        """
+        ids = list(dict.fromkeys(str(i) for i in ids))
+        results, known_missing = {}, set()
+        for start in range(0, len(ids), 900):  # SQLite-Limit für Parameter
+            results.update(self._cache_get(kind, ids[start:start + 900]))
+            known_missing |= self._cache_get_missing(kind, ids[start:start + 900])
+        missing = [i for i in ids if i not in results and i not in known_missing]
+        for start in range(0, len(missing), batch_size):
+            chunk = missing[start:start + batch_size]
+            self._throttle()
+            print(f"🌐 Lade {len(chunk)} {kind}s von Semantic Scholar...")
+            fetched = {i: item.raw_data for i, item in fetch(chunk).items()}
+            self._cache_put(kind, fetched)
+            self._cache_put_missing(kind, [i for i in chunk if i not in fetched])
+            results.update(fetched)
+        return results
+
+    def get_authors_batch(self, author_ids):
+        """Lädt mehrere Autoren (inkl. Papers mit Jahr, Zitationen, Fields) über den Batch-Endpunkt."""
+        def fetch(chunk):
+            authors = self.sch.get_authors(chunk, fields=self.COHORT_AUTHOR_FIELDS)
+            return {a.authorId: a for a in authors if a is not None}
+        return self._fetch_batch('author', author_ids, self.AUTHOR_BATCH_SIZE, fetch)
+
+    def get_papers_batch(self, paper_ids):
+        """Lädt mehrere Papers über den Batch-Endpunkt."""
+        def fetch(chunk):
+            papers = self.sch.get_papers(chunk, fields=self.COHORT_PAPER_FIELDS)
+            return {p.paperId: p for p in papers if p is not None}
+        return self._fetch_batch('paper', paper_ids, self.PAPER_BATCH_SIZE, fetch)
+
+    def get_cohort_records(self, author_ids, max_papers=200):
+        """
+        Erstellt eine Tabelle mit einer Zeile pro Autor × Paper × Field.
+
+        Returns:
+            pd.DataFrame mit den Spalten author_id, author_name, paper_id, year, field, citations
+        """
+        authors = self.get_authors_batch(author_ids)
+
+        # Papers, für die der Author-Endpunkt keine Fields geliefert hat, gezielt nachladen
+        author_papers = {
+            author_id: (data.get('papers') or [])[:max_papers] for author_id, data in authors.items()
+        }
+        incomplete = [p['paperId'] for papers in author_papers.values() for p in papers if 'fieldsOfStudy' not in p]
+        papers = self.get_papers_batch(incomplete) if incomplete else {}
+
+        rows = []
+        for author_id, author_paper_list in author_papers.items():
+            author_name = authors[author_id].get('name')
+            for paper in author_paper_list:
+                paper = papers.get(paper['paperId'], paper)
+                for field in paper.get('fieldsOfStudy') or []:
+                    rows.append((author_id, author_name, paper['paperId'], paper.get('year'), field, paper.get('citationCount') or 0))
+        return pd.DataFrame(rows, columns=['author_id', 'author_name', 'paper_id', 'year', 'field', 'citations'])
+
+    def get_cohort_fields(self, author_ids, max_papers=200):
+        """
+        Field-Profile für viele Autoren auf einmal (z. B. alle Mitglieder eines PE10-Panels).
+
+        Returns:
+            pd.DataFrame (Autor × Field × Jahr) mit den Spalten
+            author_id, author_name, field, year, papers, citations
+        """
+        records = self.get_cohort_records(author_ids, max_papers=max_papers)
+        return (
+            records.groupby(['author_id', 'author_name', 'field', 'year'], dropna=False)
+            .agg(papers=('paper_id', 'nunique'), citations=('citations', 'sum'))
+            .reset_index()
+        )
+
     def print_summary(self, analysis):
         """Druckt eine übersichtliche Zusammenfassung"""
         if not analysis:
@@ -222,21 +374,19 @@ class FieldOfStudyAnalyzer:
         print("🔗 HÄUFIGE FIELD-KOMBINATIONEN (Interdisziplinarität)")
         print("=" * 80)
         
-        field_papers = analysis['field_papers']
+        paper_fields = analysis.get('paper_fields')
+        if paper_fields is None:
+            # Ältere Analysen: Zuordnung Paper -> Fields aus field_papers rekonstruieren
+            paper_fields = defaultdict(set)
+            for field, papers in analysis['field_papers'].items():
+                for p in papers:
+                    paper_fields[p.get('paperId') or p['title']].add(field)
         
-        # Papers durchgehen und Field-Kombinationen finden
+        # Ein Durchlauf über alle Papers: jedes Field-Paar eines Papers einmal zählen
         combinations = Counter()
-        
-        for field1 in field_papers:
-            for field2 in field_papers:
-                if field1 < field2:  # Duplikate vermeiden
-                    # Gemeinsame Papers finden
-                    papers1 = {p['title'] for p in field_papers[field1]}
-                    papers2 = {p['title'] for p in field_papers[field2]}
-                    common = len(papers1 & papers2)
-                    
-                    if common >= min_count:
-                        combinations[(field1, field2)] = common
+        for fields in paper_fields.values():
+            combinations.update(pairs(sorted(fields), 2))  # sortiert, damit field1 < field2
+        combinations = Counter({pair: count for pair, count in combinations.items() if count >= min_count})
         
         print(f"\nTop 10 Field-Kombinationen (min. {min_count} gemeinsame Papers):\n")
         for i, ((field1, field2), count) in enumerate(combinations.most_common(10), 1):
@@ -244,6 +394,7 @@ class FieldOfStudyAnalyzer:
             print(f"    Gemeinsame Papers: {count}")
         
         print("\n" + "=" * 80)
+        return combinations.most_common()
 
 
 # Hauptprogramm
@@ -0,0 +1,112 @@
+"""
+Tests für den lokalen OpenAlex-Autorenindex und den Index-first-Weg der ORCID-Suche (ohne Netzwerk).
+
+Ausführen im Projektverzeichnis:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "openalex_authors.jsonl"
+
+# Caches der App in ein temporäres Verzeichnis legen, bevor die Module geladen werden
+os.environ.setdefault("ERC_CACHE_DIR", tempfile.mkdtemp(prefix="erc-test-cache-"))
+sys.path.append(str(APP_DIR))
+
+# eigene Module
+import helper_functions
+from NegativeCache import NegativeCache
+from OpenAlexAuthorIndex import OpenAlexAuthorIndex
+
+
+class OpenAlexAuthorIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = OpenAlexAuthorIndex(os.path.join(self.tmp.name, "openalex_authors.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def ingest(self):
+        with mock.patch("builtins.print"):
+            return self.index.ingest(str(FIXTURE))
+
+    def test_is_empty(self):
+        self.assertTrue(self.index.is_empty())
+        self.assertEqual(self.ingest(), 4)
+        self.assertFalse(self.index.is_empty())
+
+    def test_is_empty_without_database(self):
+        index = OpenAlexAuthorIndex(os.path.join(self.tmp.name, "openalex_authors.db"))
+        os.remove(index.db_path)
+        self.assertTrue(index.is_empty())
+
+    def test_search_exact_match_sorted_by_works_count(self):
+        self.ingest()
+        results = self.index.search("Sara van de Geer")
+        self.assertEqual([a["id"] for a in results],
+                         ["https://openalex.org/A1000000001", "https://openalex.org/A1000000002"])
+
+    def test_search_normalizes_spelling(self):
+        self.ingest()
+        self.assertEqual(self.index.search("Geer, Sara van de")[0]["id"], "https://openalex.org/A1000000001")
+        self.assertEqual(self.index.search("Jon Agren")[0]["id"], "https://openalex.org/A1000000004")
+
+    def test_search_alternative_names_and_full_text(self):
+        self.ingest()
+        self.assertEqual(self.index.search("Jose Garcia Lopez")[0]["id"], "https://openalex.org/A1000000003")
+        # Volltext: alle Namensbestandteile müssen vorkommen
+        self.assertEqual([a["id"] for a in self.index.search("Garcia")], ["https://openalex.org/A1000000003"])
+
+    def test_search_limit_and_unknown_name(self):
+        self.ingest()
+        self.assertEqual(len(self.index.search("Sara van de Geer", limit=1)), 1)
+        self.assertEqual(self.index.search("Max Mustermann"), [])
+        self.assertEqual(self.index.search("  "), [])
+
+
+class FetchOpenAlexOrcidIndexFirstTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = OpenAlexAuthorIndex(os.path.join(self.tmp.name, "openalex_authors.db"))
+        with mock.patch("builtins.print"):
+            self.index.ingest(str(FIXTURE))
+        self.negative_cache = NegativeCache(os.path.join(self.tmp.name, "negative_cache.db"))
+        self.patches = [
+            mock.patch.object(helper_functions, "get_openalex_index", return_value=self.index),
+            mock.patch.object(helper_functions, "get_negative_cache", return_value=self.negative_cache),
+            # Der Index-Weg darf die API nicht aufrufen
+            mock.patch("requests.get", side_effect=AssertionError("OpenAlex-API aufgerufen")),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.tmp.cleanup()
+
+    def test_orcid_from_index(self):
+        orcid = helper_functions.fetch_openalex_orcid_only("Sara van de Geer", resolver_mode="index_first")
+        self.assertEqual(orcid, "0000-0001-0000-0001")
+
+    def test_orcid_from_index_clears_known_miss(self):
+        self.negative_cache.record_miss("orcid", "José García", "no_orcid")
+        orcid = helper_functions.fetch_openalex_orcid_only("José García", force_retry=True, resolver_mode="index_first")
+        self.assertEqual(orcid, "0000-0001-0000-0003")
+        self.assertFalse(self.negative_cache.is_miss("orcid", "José García"))
+
+    def test_offline_without_match_skips_api(self):
+        self.assertIsNone(helper_functions.fetch_openalex_orcid_only("Max Mustermann", resolver_mode="offline"))
+
+
+if __name__ == "__main__":
+    unittest.main()